@@ -15,6 +15,21 @@ down_revision = None  # Update this with your last migration ID
 branch_labels = None
 depends_on = None
 
+# Rows rewritten per UPDATE statement during the user_id backfill
+BATCH_SIZE = 10000
+
+
+def _backfill_user_id(value_sql: str, extra_filter: str = "") -> None:
+    """Populate chats.user_id in bounded batches, committing each batch."""
+    bind = op.get_bind()
+    statement = sa.text(
+        f"UPDATE chats SET user_id = {value_sql} WHERE id IN ("
+        f"SELECT id FROM chats WHERE user_id IS NULL{extra_filter} "
+        f"ORDER BY id LIMIT :batch_size)"
+    )
+    while bind.execute(statement, {"batch_size": BATCH_SIZE}).rowcount:
+        pass
+
 
 def upgrade() -> None:
     """
@@ -32,12 +47,21 @@ def upgrade() -> None:
     # Add user_id column (temporarily nullable for migration)
     op.add_column('chats', sa.Column('user_id', sa.VARCHAR(length=255), nullable=True))
     
-    # Migrate data from user_name to user_id if user_name exists
-    try:
-        op.execute('UPDATE chats SET user_id = user_name WHERE user_id IS NULL')
-    except:
-        # If user_name doesn't exist, set default value
-        op.execute("UPDATE chats SET user_id = 'anonymous' WHERE user_id IS NULL")
+    # Migrate data from user_name to user_id if user_name exists.
+    # Runs outside the migration transaction so each batch commits on its own
+    # and row locks on chats are held only for the duration of one batch.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS tmp_user_id_null "
+            "ON chats(id) WHERE user_id IS NULL"
+        )
+        try:
+            _backfill_user_id("user_name", " AND user_name IS NOT NULL")
+        except Exception:
+            # If user_name doesn't exist, fall through to the default value
+            pass
+        _backfill_user_id("'anonymous'")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS tmp_user_id_null")
     
     # Make user_id not null after migration
     op.alter_column('chats', 'user_id', nullable=False)
@@ -45,9 +69,11 @@ def upgrade() -> None:
     # Rename bedrock_response to response
     op.alter_column('chats', 'bedrock_response', new_column_name='response')
     
-    # Add indexes for better query performance
-    op.create_index('idx_chats_message_uid', 'chats', ['message_uid'], unique=False)
-    op.create_index('idx_chats_user_id', 'chats', ['user_id'], unique=False)
+    # Add indexes for better query performance. Built concurrently outside
+    # the migration transaction so writes to chats are not blocked.
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chats_message_uid ON chats(message_uid)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chats_user_id ON chats(user_id)")
     
     # Optional: Drop user_name column if it exists (uncomment if needed)
     # try:
@@ -60,8 +86,9 @@ def downgrade() -> None:
     """Revert the schema changes"""
     
     # Drop indexes
-    op.drop_index('idx_chats_user_id', table_name='chats')
-    op.drop_index('idx_chats_message_uid', table_name='chats')
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_chats_user_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_chats_message_uid")
     
     # Rename response back to bedrock_response
     op.alter_column('chats', 'response', new_column_name='bedrock_response')
@@ -0,0 +1,43 @@
+"""add composite chats indexes for per-user and per-chat listings
+
+Revision ID: chats_composite_indexes
+Revises: fix_user_name_column
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'chats_composite_indexes'
+down_revision = 'fix_user_name_column'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Replace the single-column created_at index with composite indexes:
+    1. (user_id, created_at DESC) INCLUDE (chat_id, id) for per-user history
+    2. (chat_id, created_at) for fetching the messages of one chat
+    """
+    # Built concurrently outside the migration transaction so writes continue
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chats_user_created "
+            "ON chats (user_id, created_at DESC) INCLUDE (chat_id, id)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chats_chat_created "
+            "ON chats (chat_id, created_at)"
+        )
+        # Covered by the composite indexes; dropping it saves a write per INSERT
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chats_created_at")
+
+
+def downgrade() -> None:
+    """Revert the index changes"""
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chats_created_at ON chats (created_at)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_chats_chat_created")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_chats_user_created")
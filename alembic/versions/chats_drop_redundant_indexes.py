@@ -0,0 +1,36 @@
+"""drop single-column chats indexes covered by the composites
+
+Revision ID: chats_drop_redundant_indexes
+Revises: users_uid_server_default
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'chats_drop_redundant_indexes'
+down_revision = 'users_uid_server_default'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    user_id and chat_id are the leading columns of ix_chats_user_created_id
+    and ix_chats_chat_created_id, which serve every lookup the single-column
+    indexes did (including the user_id + created_at window); dropping them
+    saves two index updates per INSERT.
+    """
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_chats_user_id")
+        # Name used when the table was created from the models
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chats_user_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chats_chat_id")
+
+
+def downgrade() -> None:
+    """Revert the changes"""
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chats_chat_id ON chats (chat_id)")
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chats_user_id ON chats (user_id)")
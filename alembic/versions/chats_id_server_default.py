@@ -0,0 +1,32 @@
+"""generate chats.id in the database when not supplied
+
+Revision ID: chats_id_server_default
+Revises: chats_composite_indexes
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'chats_id_server_default'
+down_revision = 'chats_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Give chats.id a server-side default so rows inserted without an id
+    (raw SQL, bulk loads) get one from Postgres. The application supplies
+    time-ordered UUIDv7 ids itself because it returns them before the
+    INSERT runs.
+    """
+    # gen_random_uuid() is built in from PG13; pgcrypto provides it on older servers
+    op.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto")
+    op.alter_column('chats', 'id', server_default=sa.text("gen_random_uuid()"))
+
+
+def downgrade() -> None:
+    """Revert the changes"""
+    op.alter_column('chats', 'id', server_default=None)
@@ -0,0 +1,51 @@
+"""add (created_at, id) keyset indexes for history pagination
+
+Revision ID: chats_keyset_indexes
+Revises: chats_created_at_brin
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'chats_keyset_indexes'
+down_revision = 'chats_created_at_brin'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    History listings page by the (created_at, id) row value, so id becomes part
+    of the index key and the composite indexes from chats_composite_indexes
+    are replaced:
+    1. (user_id, created_at DESC, id DESC) INCLUDE (chat_id) for per-user history
+    2. (chat_id, created_at, id) for fetching the messages of one chat
+    """
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chats_user_created_id "
+            "ON chats (user_id, created_at DESC, id DESC) INCLUDE (chat_id)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chats_chat_created_id "
+            "ON chats (chat_id, created_at, id)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_chats_user_created")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_chats_chat_created")
+
+
+def downgrade() -> None:
+    """Revert the index changes"""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chats_user_created "
+            "ON chats (user_id, created_at DESC) INCLUDE (chat_id, id)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chats_chat_created "
+            "ON chats (chat_id, created_at)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chats_chat_created_id")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chats_user_created_id")
@@ -0,0 +1,57 @@
+"""make chats.chat_metadata non-null JSONB with a GIN index
+
+Revision ID: chats_metadata_gin
+Revises: chats_keyset_indexes
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'chats_metadata_gin'
+down_revision = 'chats_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+# Rows rewritten per UPDATE statement during the chat_metadata backfill
+BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    """
+    1. Backfill NULL chat_metadata with '{}' and make the column NOT NULL DEFAULT '{}'
+    2. Add a jsonb_path_ops GIN index so containment (@>) filters run in Postgres
+    """
+    op.alter_column('chats', 'chat_metadata', server_default=sa.text("'{}'::jsonb"))
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        statement = sa.text(
+            "UPDATE chats SET chat_metadata = '{}'::jsonb WHERE id IN ("
+            "SELECT id FROM chats WHERE chat_metadata IS NULL ORDER BY id LIMIT :batch_size)"
+        )
+        while bind.execute(statement, {"batch_size": BATCH_SIZE}).rowcount:
+            pass
+
+        # A validated CHECK lets SET NOT NULL skip its full-table scan under an
+        # exclusive lock; the validation itself only takes a SHARE UPDATE EXCLUSIVE lock
+        op.execute(
+            "ALTER TABLE chats ADD CONSTRAINT chat_metadata_not_null "
+            "CHECK (chat_metadata IS NOT NULL) NOT VALID"
+        )
+        op.execute("ALTER TABLE chats VALIDATE CONSTRAINT chat_metadata_not_null")
+        op.execute("ALTER TABLE chats ALTER COLUMN chat_metadata SET NOT NULL")
+        op.execute("ALTER TABLE chats DROP CONSTRAINT chat_metadata_not_null")
+
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chats_meta_gin "
+            "ON chats USING GIN (chat_metadata jsonb_path_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Revert the changes"""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chats_meta_gin")
+    op.alter_column('chats', 'chat_metadata', nullable=True, server_default=None)
@@ -0,0 +1,49 @@
+"""compress chats.response with lz4
+
+Revision ID: chats_response_lz4
+Revises: chats_drop_redundant_indexes
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'chats_response_lz4'
+down_revision = 'chats_drop_redundant_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Compress large chats.response values (TOASTed Bedrock answers) with lz4,
+    which decompresses several times faster than the default pglz when
+    history pages read them. Catalog-only change: existing rows keep their
+    current compression until rewritten. Skipped on servers older than
+    PG14 or built without lz4.
+    """
+    op.execute("""
+        DO $$
+        BEGIN
+            IF current_setting('server_version_num')::int >= 140000 THEN
+                ALTER TABLE chats ALTER COLUMN response SET COMPRESSION lz4;
+            END IF;
+        EXCEPTION WHEN feature_not_supported THEN
+            RAISE NOTICE 'lz4 not available, keeping default compression for chats.response';
+        END
+        $$
+    """)
+
+
+def downgrade() -> None:
+    """Revert the changes"""
+    op.execute("""
+        DO $$
+        BEGIN
+            IF current_setting('server_version_num')::int >= 140000 THEN
+                ALTER TABLE chats ALTER COLUMN response SET COMPRESSION default;
+            END IF;
+        END
+        $$
+    """)
@@ -15,6 +15,21 @@ down_revision = 'e0abfab9cacb'
 branch_labels = None
 depends_on = None
 
+# Rows rewritten per UPDATE statement during the user_id backfill
+BATCH_SIZE = 10000
+
+
+def _backfill_user_id(value_sql: str, extra_filter: str = "") -> None:
+    """Populate chats.user_id in bounded batches, committing each batch."""
+    bind = op.get_bind()
+    statement = sa.text(
+        f"UPDATE chats SET user_id = {value_sql} WHERE id IN ("
+        f"SELECT id FROM chats WHERE user_id IS NULL{extra_filter} "
+        f"ORDER BY id LIMIT :batch_size)"
+    )
+    while bind.execute(statement, {"batch_size": BATCH_SIZE}).rowcount:
+        pass
+
 
 def upgrade() -> None:
     """
@@ -24,12 +39,19 @@ def upgrade() -> None:
     """
     
     # First, ensure user_id column exists and is populated
-    try:
-        # Copy data from user_name to user_id if user_id is empty
-        op.execute("UPDATE chats SET user_id = user_name WHERE user_id IS NULL AND user_name IS NOT NULL")
-        op.execute("UPDATE chats SET user_id = 'anonymous' WHERE user_id IS NULL")
-    except Exception as e:
-        print(f"Data migration note: {e}")
+    # Batches run in autocommit mode so each one commits independently
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS tmp_user_id_null "
+            "ON chats(id) WHERE user_id IS NULL"
+        )
+        try:
+            # Copy data from user_name to user_id if user_id is empty
+            _backfill_user_id("user_name", " AND user_name IS NOT NULL")
+            _backfill_user_id("'anonymous'")
+        except Exception as e:
+            print(f"Data migration note: {e}")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS tmp_user_id_null")
     
     # Drop the old user_name column
     try:
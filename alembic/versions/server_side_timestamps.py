@@ -0,0 +1,55 @@
+"""store timestamps as timestamptz filled in by the database
+
+Revision ID: server_side_timestamps
+Revises: chats_id_server_default
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'server_side_timestamps'
+down_revision = 'chats_id_server_default'
+branch_labels = None
+depends_on = None
+
+TIMESTAMP_COLUMNS = [
+    ('chats', 'created_at'),
+    ('chats', 'updated_at'),
+    ('users', 'created_at'),
+    ('users', 'updated_at'),
+]
+
+
+def upgrade() -> None:
+    """
+    1. Convert created_at / updated_at to TIMESTAMPTZ. Existing values were
+       written from datetime.now(timezone.utc), so they are interpreted as UTC.
+    2. Default them to now() so inserts no longer send them.
+
+    Note: the type change rewrites chats and users under an exclusive lock.
+    """
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=postgresql.TIMESTAMP(timezone=True),
+            existing_type=postgresql.TIMESTAMP(),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            server_default=sa.text("now()"),
+        )
+
+
+def downgrade() -> None:
+    """Revert the changes"""
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=postgresql.TIMESTAMP(),
+            existing_type=postgresql.TIMESTAMP(timezone=True),
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+            server_default=None,
+        )
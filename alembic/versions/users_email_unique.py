@@ -0,0 +1,35 @@
+"""add a unique index on lower(users.email)
+
+Revision ID: users_email_unique
+Revises: chats_metadata_gin
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'users_email_unique'
+down_revision = 'chats_metadata_gin'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Unique, case-insensitive email index. It serves every lookup by email
+    and is the arbiter for INSERT ... ON CONFLICT during signup.
+    Fails (leaving no valid index) if users already holds emails that differ
+    only in case; those rows must be merged first.
+    """
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email "
+            "ON users (lower(email))"
+        )
+
+
+def downgrade() -> None:
+    """Revert the changes"""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email")
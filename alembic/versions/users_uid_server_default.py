@@ -0,0 +1,30 @@
+"""generate users.uid in the database
+
+Revision ID: users_uid_server_default
+Revises: users_email_unique
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'users_uid_server_default'
+down_revision = 'users_email_unique'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Let Postgres assign users.uid; signup reads it back through
+    INSERT ... RETURNING instead of generating it in Python.
+    """
+    # gen_random_uuid() is built in from PG13; pgcrypto provides it on older servers
+    op.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto")
+    op.alter_column('users', 'uid', server_default=sa.text("gen_random_uuid()"))
+
+
+def downgrade() -> None:
+    """Revert the changes"""
+    op.alter_column('users', 'uid', server_default=None)
@@ -30,15 +30,18 @@ import os
 import uvicorn
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
 
 from src.auth.routes import auth_router
 from src.chats.routes import chat_router
 from src.history.routes import history_router
 from src.config_routes.routes import config_router
 from src.db.main import init_db
-from src.middleware import register_middleware
+from src.db.redis import token_blocklist
+from src.history.service import history_writer
+from src.celery_tasks import email_batcher
+from src.middleware import HEALTH_OK_BODY, register_middleware
 from src.config import Config as settings
 from src.logger import setup_logger
 
@@ -67,77 +70,70 @@ async def lifespan(app: FastAPI):
     logger.info("⚡ Fast startup mode - skipping DB initialization")
     logger.info("✅ Application ready to accept requests")
     logger.info("📝 Database tables will be created automatically on first use")
+
+    # Batches chat history inserts issued after responses are sent
+    history_writer.start()
+    # Batches outgoing emails into bulk Celery tasks
+    email_batcher.start()
     
     yield
     
     print("🛑 Shutting down...")
+    await history_writer.stop()
+    await email_batcher.stop()
+    await token_blocklist.aclose()
  
 
 
-"""Create and configure the FastAPI application"""
-app = FastAPI(
-    title="Security Agents API",
-    version="2.0.0",
-    description="Security Agents API with AWS Bedrock integration",
-    openapi_url=f"{version_prefix}/openapi.json",
-    docs_url=f"{version_prefix}/docs",
-    redoc_url=f"{version_prefix}/redoc",
-    lifespan=lifespan
-)
-
-# Register middleware (CORS, logging, trusted hosts)
-register_middleware(app)
-
-# Include routers with API v1 prefix
-app.include_router(auth_router, prefix=f"{version_prefix}/auth", tags=["Auth"])
-app.include_router(chat_router, prefix=f"{version_prefix}/chats", tags=["Chat"])
-app.include_router(history_router, prefix=f"{version_prefix}/history", tags=["History"])
-app.include_router(config_router, prefix=f"{version_prefix}/config", tags=["Config"])
-
 # Health check endpoints
-@app.get("/health", tags=["Health"])
+health_router = APIRouter()
+
+@health_router.get("/health", tags=["Health"])
 async def health_check():
-    """Basic health check endpoint - always returns OK if app is running"""
-    return {
-        "status": "ok",
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }
+    """Basic health check endpoint - always returns OK if app is running.
+
+    GET requests are answered by HealthCheckMiddleware before they reach this
+    route; it is kept so the endpoint still appears in the API docs.
+    """
+    return Response(content=HEALTH_OK_BODY, media_type="application/json")
 
-@app.get("/api/v1/health", tags=["Health"])
+@health_router.get("/api/v1/health", tags=["Health"])
 async def api_health_check():
     """API health check endpoint with version info"""
-    return {
+    # orjson serializes the datetime itself; returning the response directly
+    # also skips FastAPI's jsonable_encoder pass
+    return ORJSONResponse({
         "status": "ok",
         "version": "2.0.0",
         "service": "security-agents-api",
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }
+        "timestamp": datetime.now(timezone.utc)
+    })
 
-@app.get("/health/db", tags=["Health"])
+@health_router.get("/health/db", tags=["Health"])
 async def database_health_check():
     """Database connectivity health check - initializes tables if needed"""
     try:
         # Initialize database tables if not already done
         await init_db()
-        return {
+        return ORJSONResponse({
             "status": "ok",
             "database": "connected",
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+            "timestamp": datetime.now(timezone.utc)
+        })
     except Exception as e:
         logger.error(f"Database health check failed: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "error",
                 "database": "disconnected",
                 "error": str(e),
-                "timestamp": datetime.now(timezone.utc).isoformat()
+                "timestamp": datetime.now(timezone.utc)
             }
         )
 
 
-@app.get("/", tags=["Root"])
+@health_router.get("/", tags=["Root"])
 async def root():
     """Root endpoint"""
     return {
@@ -147,17 +143,49 @@ async def root():
         "health": "/health"
     }
 
+
+def create_app() -> FastAPI:
+    """Create and configure the FastAPI application.
+
+    Served through uvicorn's --factory mode, so the app, its middleware stack
+    and routes are built once per worker process rather than on every import
+    of this module.
+    """
+    app = FastAPI(
+        title="Security Agents API",
+        version="2.0.0",
+        description="Security Agents API with AWS Bedrock integration",
+        openapi_url=f"{version_prefix}/openapi.json",
+        docs_url=f"{version_prefix}/docs",
+        redoc_url=f"{version_prefix}/redoc",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan
+    )
+
+    # Register middleware (CORS, logging, trusted hosts)
+    register_middleware(app)
+
+    # Include routers with API v1 prefix
+    app.include_router(auth_router, prefix=f"{version_prefix}/auth", tags=["Auth"])
+    app.include_router(chat_router, prefix=f"{version_prefix}/chats", tags=["Chat"])
+    app.include_router(history_router, prefix=f"{version_prefix}/history", tags=["History"])
+    app.include_router(config_router, prefix=f"{version_prefix}/config", tags=["Config"])
+    app.include_router(health_router)
+
+    return app
+
+
 if __name__ == "__main__":
     logger.info(f"Starting server on port 8000")
     
     # Use proper event loop for Windows psycopg compatibility
     if sys.platform == "win32":
         async def run_server():
-            config = uvicorn.Config("main:app", host="127.0.0.1", port=8000, reload=True)
+            config = uvicorn.Config("main:create_app", factory=True, host="127.0.0.1", port=8000, reload=True)
             server = uvicorn.Server(config)
             await server.serve()
         
         # Run with SelectorEventLoop as suggested by psycopg error
         asyncio.run(run_server(), loop_factory=lambda: asyncio.SelectorEventLoop(selectors.SelectSelector()))
     else:
-        uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
+        uvicorn.run("main:create_app", factory=True, host="127.0.0.1", port=8000, reload=True)
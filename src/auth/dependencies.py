@@ -10,7 +10,7 @@ from src.db.models import User
 from src.db.redis import token_in_blocklist
 
 from .service import UserService
-from .utils import decode_token
+from .utils import decode_token_cached
 
 user_service = UserService()
 
@@ -24,9 +24,10 @@ class TokenBearer(HTTPBearer):
 
         token = creds.credentials
 
-        token_data = decode_token(token)
+        # Decoded once per request; repeat requests with the same token hit the cache
+        token_data = decode_token_cached(token)
 
-        if not self.token_valid(token):
+        if token_data is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or expired token"
@@ -42,11 +43,6 @@ class TokenBearer(HTTPBearer):
 
         return token_data
 
-    def token_valid(self, token: str) -> bool:
-        token_data = decode_token(token)
-
-        return token_data is not None
-
     def verify_token_data(self, token_data):
         raise NotImplementedError("Please Override this method in child classes")
 
@@ -82,7 +78,8 @@ async def get_current_user(
 
 class RoleChecker:
     def __init__(self, allowed_roles: List[str]) -> None:
-        self.allowed_roles = allowed_roles
+        # Frozen once at construction so each request does an O(1) membership test
+        self.allowed_roles = frozenset(allowed_roles)
 
     def __call__(self, current_user: User = Depends(get_current_user)) -> Any:
         if not current_user.is_verified:
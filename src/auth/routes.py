@@ -1,11 +1,13 @@
-from datetime import datetime, timedelta
+import asyncio
+import time
+from datetime import timedelta
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, BackgroundTasks, Depends, status
 from fastapi.exceptions import HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.db.main import get_session
+from src.db.main import get_ro_session, get_session
 from src.db.redis import add_jti_to_blocklist
 
 from .dependencies import (
@@ -30,9 +32,12 @@ from .utils import (
     decode_url_safe_token,
 )
 from src.config import Config
-from src.celery_tasks import send_email
+from src.logger import setup_logger
+from src.celery_tasks import email_batcher
 from src.templates.template_loader import render_template
 
+logger = setup_logger(__name__)
+
 auth_router = APIRouter()
 user_service = UserService()
 role_checker = RoleChecker(["admin", "user"])
@@ -41,6 +46,73 @@ role_checker = RoleChecker(["admin", "user"])
 REFRESH_TOKEN_EXPIRY = 2
 
 
+# Email senders run as background tasks, after the response has been sent
+async def _send_verification_email(email: str):
+    # Create verification token
+    token = create_url_safe_token({"email": email})
+    logger.debug("🔑 Verification token created for %s", email)
+
+    # Frontend verification link with token as path parameter
+    verification_link = f"http://{Config.FRONTEND_DOMAIN}/verify-email/{token}"
+    logger.debug("🔗 Verification link: %s", verification_link)
+    # Note: Frontend will call: /api/v1/auth/verify/{token}
+
+    # Send verification email using template
+    emails = [email]
+    subject = "🛡️ Verify Your Email - Security Platform"
+    
+    try:
+        # Render template with variables and send using existing Celery setup
+        html_body = render_template('email_verification', 
+                                   verification_link=verification_link, email=email)
+        
+        # Send email via Celery, batched with other outgoing emails
+        await email_batcher.enqueue(emails, subject, html_body)
+        logger.info("✅ Email queued successfully for %s", email)
+        
+    except Exception as e:
+        logger.error("❌ Email sending failed for %s: %s", email, e)
+        # Don't fail the signup process if email fails, just log it
+        # The user can still use the resend functionality
+
+
+async def _send_welcome_email(email: str):
+    welcome_subject = "🎉 Welcome to Security Platform - Account Verified!"
+
+    try:
+        html_body = render_template('welcome',
+                                  user_name=email.split('@')[0].title(),  # Use email prefix as name
+                                  email=email,
+                                  login_link=f"http://{Config.FRONTEND_DOMAIN}/login")
+        await email_batcher.enqueue([email], welcome_subject, html_body)
+
+    except Exception as e:
+        # Runs after the response has been sent, so there is no caller to report to
+        logger.error("❌ Email sending failed for %s: %s", email, e)
+
+
+async def _send_password_reset_email(email: str):
+    token = create_url_safe_token({"email": email})
+
+    # Frontend password reset link with proper API prefix for backend calls
+    reset_link = f"http://{Config.FRONTEND_DOMAIN}/reset-password?token={token}"
+    # Note: Frontend will call: /api/v1/auth/password-reset-confirm/{token}
+
+    # Send password reset email using template
+    subject = "🔐 Reset Your Password - Security Platform"
+
+    try:
+        html_body = render_template('password_reset',
+                                   reset_link=reset_link,
+                                   email=email,
+                                   user_name=email.split('@')[0].title())  # Use email prefix as name
+        await email_batcher.enqueue([email], subject, html_body)
+
+    except Exception as e:
+        # Runs after the response has been sent, so there is no caller to report to
+        logger.error("❌ Email sending failed for %s: %s", email, e)
+
+
 @auth_router.post("/send_mail")
 async def send_mail(emails: EmailModel):
     emails = emails.addresses
@@ -48,7 +120,7 @@ async def send_mail(emails: EmailModel):
     # Send test email using template
     subject = "Welcome to the Security Platform"
     html_body = render_template('welcome_test')
-    send_email.delay(emails, subject, html_body)
+    await email_batcher.enqueue(emails, subject, html_body)
 
     return {"message": "Email sent successfully"}
 
@@ -56,6 +128,7 @@ async def send_mail(emails: EmailModel):
 @auth_router.post("/signup", status_code=status.HTTP_201_CREATED)
 async def create_user_Account(
     user_data: UserCreateModel,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
 ):
     """
@@ -65,44 +138,17 @@ async def create_user_Account(
     """
     email = user_data.email
 
-    user_exists = await user_service.user_exist(email, session)
+    new_user = await user_service.create_user(user_data, session)
 
-    if user_exists:
+    if new_user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists"
         )
+    logger.info("✅ User created successfully: %s", new_user.email)
 
-    new_user = await user_service.create_user(user_data, session)
-    print(f"✅ User created successfully: {new_user.email}")
-
-    # Create verification token
-    token = create_url_safe_token({"email": email})
-    print(f"🔑 Verification token created for {email}")
-
-    # Frontend verification link with token as path parameter
-    verification_link = f"http://{Config.FRONTEND_DOMAIN}/verify-email/{token}"
-    print(f"🔗 Verification link: {verification_link}")
-    # Note: Frontend will call: /api/v1/auth/verify/{token}
-
-    # Send verification email using template
-    emails = [email]
-    subject = "🛡️ Verify Your Email - Security Platform"
-    
-    try:
-        # Render template with variables and send using existing Celery setup
-        html_body = render_template('email_verification', 
-                                   verification_link=verification_link, email=email)
-        
-        # Send email via Celery task
-        task_result = send_email.delay(emails, subject, html_body)
-        print(f"✅ Email task queued successfully for {email}")
-        print(f"📋 Task ID: {task_result.id}")
-        
-    except Exception as e:
-        print(f"❌ Email sending failed for {email}: {str(e)}")
-        # Don't fail the signup process if email fails, just log it
-        # The user can still use the resend functionality
+    # Token, template rendering and queueing happen after the 201 is sent
+    background_tasks.add_task(_send_verification_email, email)
 
     return {
         "message": "Account created successfully! Please check your email to verify your account.",
@@ -117,7 +163,11 @@ async def create_user_Account(
 
 
 @auth_router.get("/verify/{token}")
-async def verify_user_account(token: str, session: AsyncSession = Depends(get_session)):
+async def verify_user_account(
+    token: str,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_session),
+):
     """
     Verify user email and complete registration process
     Changes user status from is_verified=False to is_verified=True
@@ -141,23 +191,26 @@ async def verify_user_account(token: str, session: AsyncSession = Depends(get_se
                 detail="Token does not contain valid email information"
             )
 
-        # Find the user in database
-        user = await user_service.get_user_by_email(user_email, session)
+        # Complete the registration by setting is_verified = True. The common
+        # case is a single UPDATE ... RETURNING with no prior SELECT.
+        user = await user_service.mark_verified(user_email, session)
 
         if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User account not found. Please sign up again."
-            )
-        
-        # Check if user is already verified
-        if user.is_verified:
-            return JSONResponse(
+            # Nothing updated: the account is either missing or already verified
+            existing_user = await user_service.get_user_by_email(user_email, session)
+
+            if not existing_user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User account not found. Please sign up again."
+                )
+
+            return ORJSONResponse(
                 content={
                     "message": "Account is already verified and fully registered",
                     "status": "already_verified",
                     "user": {
-                        "email": user.email,
+                        "email": existing_user.email,
                         "is_verified": True,
                         "registration_complete": True
                     }
@@ -165,18 +218,10 @@ async def verify_user_account(token: str, session: AsyncSession = Depends(get_se
                 status_code=status.HTTP_200_OK,
             )
 
-        # Complete the registration by setting is_verified = True
-        await user_service.update_user(user, {"is_verified": True}, session)
-
-        # Send welcome email using template
-        welcome_subject = "🎉 Welcome to Security Platform - Account Verified!"
-        html_body = render_template('welcome',
-                                  user_name=user.email.split('@')[0].title(),  # Use email prefix as name
-                                  email=user.email,
-                                  login_link=f"http://{Config.FRONTEND_DOMAIN}/login")
-        send_email.delay([user.email], welcome_subject, html_body)
+        # Send welcome email using template, after the response is sent
+        background_tasks.add_task(_send_welcome_email, user.email)
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "message": "🎉 Email verified successfully! Your account is now fully registered.",
                 "status": "verification_complete",
@@ -200,8 +245,8 @@ async def verify_user_account(token: str, session: AsyncSession = Depends(get_se
         )
     except Exception as e:
         # Log the error for debugging
-        print(f"Verification error: {str(e)}")
-        return JSONResponse(
+        logger.error("Verification error: %s", e)
+        return ORJSONResponse(
             content={
                 "message": "An error occurred during email verification. Please try again or contact support.",
                 "status": "verification_error"
@@ -213,7 +258,7 @@ async def verify_user_account(token: str, session: AsyncSession = Depends(get_se
 @auth_router.get("/registration-status/{email}")
 async def check_registration_status(
     email: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_ro_session)
 ):
     """
     Check user registration and verification status
@@ -222,7 +267,7 @@ async def check_registration_status(
     user = await user_service.get_user_by_email(email, session)
     
     if not user:
-        return JSONResponse(
+        return ORJSONResponse(
             content={
                 "exists": False,
                 "message": "No account found with this email address"
@@ -230,7 +275,7 @@ async def check_registration_status(
             status_code=status.HTTP_404_NOT_FOUND,
         )
     
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "exists": True,
             "email": user.email,
@@ -238,7 +283,7 @@ async def check_registration_status(
             "registration_complete": user.is_verified,
             "status": "fully_registered" if user.is_verified else "pending_verification",
             "message": "Account fully registered" if user.is_verified else "Account created, email verification pending",
-            "created_at": user.created_at.isoformat() if hasattr(user, 'created_at') else None
+            "created_at": user.created_at
         },
         status_code=status.HTTP_200_OK,
     )
@@ -261,7 +306,7 @@ async def login_users(
                 detail="Please verify your email address before logging in. Check your email for the verification link."
             )
             
-        password_valid = verify_password(password, user.password_hash)
+        password_valid = await asyncio.to_thread(verify_password, password, user.password_hash)
 
         if password_valid:
             access_token = create_access_token(
@@ -278,7 +323,7 @@ async def login_users(
                 expiry=timedelta(days=REFRESH_TOKEN_EXPIRY),
             )
 
-            return JSONResponse(
+            return ORJSONResponse(
                 content={
                     "message": "Login successful",
                     "access_token": access_token,
@@ -297,10 +342,10 @@ async def login_users(
 async def get_new_access_token(token_details: dict = Depends(RefreshTokenBearer())):
     expiry_timestamp = token_details["exp"]
 
-    if datetime.fromtimestamp(expiry_timestamp) > datetime.now():
+    if expiry_timestamp > time.time():
         new_access_token = create_access_token(user_data=token_details["user"])
 
-        return JSONResponse(content={"access_token": new_access_token})
+        return ORJSONResponse(content={"access_token": new_access_token})
 
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -321,30 +366,22 @@ async def revoke_token(token_details: dict = Depends(AccessTokenBearer())):
 
     await add_jti_to_blocklist(jti)
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={"message": "Logged Out Successfully"}, status_code=status.HTTP_200_OK
     )
 
 
 @auth_router.post("/password-reset-request")
-async def password_reset_request(email_data: PasswordResetRequestModel):
+async def password_reset_request(
+    email_data: PasswordResetRequestModel,
+    background_tasks: BackgroundTasks,
+):
     email = email_data.email
 
-    token = create_url_safe_token({"email": email})
-
-    # Frontend password reset link with proper API prefix for backend calls
-    reset_link = f"http://{Config.FRONTEND_DOMAIN}/reset-password?token={token}"
-    # Note: Frontend will call: /api/v1/auth/password-reset-confirm/{token}
-
-    # Send password reset email using template
-    subject = "🔐 Reset Your Password - Security Platform"
-    html_body = render_template('password_reset',
-                               reset_link=reset_link,
-                               email=email,
-                               user_name=email.split('@')[0].title())  # Use email prefix as name
-    send_email.delay([email], subject, html_body)
+    # Token, template rendering and queueing happen after the response is sent
+    background_tasks.add_task(_send_password_reset_email, email)
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={
             "message": "Please check your email for instructions to reset your password",
         },
@@ -379,15 +416,15 @@ async def reset_account_password(
                 detail="User not found"
             )
 
-        passwd_hash = generate_passwd_hash(new_password)
+        passwd_hash = await asyncio.to_thread(generate_passwd_hash, new_password)
         await user_service.update_user(user, {"password_hash": passwd_hash}, session)
 
-        return JSONResponse(
+        return ORJSONResponse(
             content={"message": "Password reset Successfully"},
             status_code=status.HTTP_200_OK,
         )
 
-    return JSONResponse(
+    return ORJSONResponse(
         content={"message": "Error occured during password reset."},
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
     )
@@ -1,19 +1,37 @@
+import re
 import uuid
 from datetime import datetime
-from typing import List
+from typing import Annotated, List
 
-from pydantic import BaseModel, Field
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
+
+
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def _check_email(value: str) -> str:
+    """Cheap shape check (no DNS or deliverability lookups); normalizes to lowercase"""
+    if not _EMAIL_RE.match(value):
+        raise ValueError("Invalid email address")
+    return value.lower()
+
+
+Email = Annotated[str, AfterValidator(_check_email)]
 
 
 class UserCreateModel(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     first_name: str = Field(min_length=2, max_length=25)
     last_name: str = Field(min_length=2, max_length=25)
     username: str = Field(min_length=3, max_length=30)
-    email: str = Field(max_length=100)
+    email: Email = Field(max_length=100)
     password: str = Field(min_length=8) 
 
 
 class UserModel(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     uid: uuid.UUID
     username: str
     email: str
@@ -26,17 +44,25 @@ class UserModel(BaseModel):
 
 
 class UserLoginModel(BaseModel):
-    email: str 
+    model_config = ConfigDict(extra="ignore")
+
+    email: Email
     password: str 
 
 class EmailModel(BaseModel):
-    addresses: List[str]
+    model_config = ConfigDict(extra="ignore")
+
+    addresses: List[Email]
 
 
 class PasswordResetRequestModel(BaseModel):
-    email: str
+    model_config = ConfigDict(extra="ignore")
+
+    email: Email
 
 
 class PasswordResetConfirmModel(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     new_password: str
     confirm_new_password: str
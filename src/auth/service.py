@@ -1,3 +1,7 @@
+import asyncio
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -9,7 +13,8 @@ from .utils import generate_passwd_hash
 
 class UserService:
     async def get_user_by_email(self, email: str, session: AsyncSession):
-        statement = select(User).where(User.email == email)
+        # Matches the unique lower(email) index
+        statement = select(User).where(sa.func.lower(User.email) == email.lower())
 
         result = await session.exec(statement)
 
@@ -17,20 +22,28 @@ class UserService:
 
         return user
 
-    async def user_exist(self, email, session: AsyncSession):
-        user = await self.get_user_by_email(email, session)
-
-        return True if user is not None else False
-
     async def create_user(self, user_data: UserCreateModel, session: AsyncSession):
-        user_data_dict = user_data.model_dump()
-
-        new_user = User(**user_data_dict)
-
-        new_user.password_hash = generate_passwd_hash(user_data_dict["password"])
-        new_user.role = "user"
+        """Insert a new user; returns None if the email is already registered.
 
-        session.add(new_user)
+        A single INSERT ... ON CONFLICT DO NOTHING RETURNING replaces a
+        separate existence check, and stays correct under concurrent signups.
+        """
+        user_data_dict = user_data.model_dump()
+        password = user_data_dict.pop("password")
+
+        statement = (
+            pg_insert(User)
+            .values(
+                **user_data_dict,
+                password_hash=await asyncio.to_thread(generate_passwd_hash, password),
+                role="user",
+                is_verified=False,
+            )
+            .on_conflict_do_nothing(index_elements=[sa.func.lower(User.email)])
+            .returning(User)
+        )
+        result = await session.execute(statement)
+        new_user = result.scalar_one_or_none()
 
         await session.commit()
 
@@ -44,3 +57,21 @@ class UserService:
         await session.commit()
 
         return user
+
+    async def mark_verified(self, email: str, session: AsyncSession):
+        """Set is_verified for the unverified user with this email in one
+        UPDATE ... RETURNING; returns None if there is no such user.
+        """
+        statement = (
+            sa.update(User)
+            .where(sa.func.lower(User.email) == email.lower(), User.is_verified.is_(False))
+            .values(is_verified=True)
+            .returning(User)
+            .execution_options(synchronize_session=False)
+        )
+        result = await session.execute(statement)
+        user = result.scalar_one_or_none()
+
+        await session.commit()
+
+        return user
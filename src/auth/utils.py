@@ -1,20 +1,37 @@
 import logging
+import time
 import uuid
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from datetime import timedelta
 from itsdangerous import URLSafeTimedSerializer
 
 import jwt
 import hashlib
+import orjson
 from passlib.context import CryptContext
 
 from src.config import Config
 
-passwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# time_cost/memory_cost tuned to roughly 50 ms per hash; existing hashes keep
+# the parameters encoded in them and still verify
+passwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=65536,  # KiB
+    argon2__parallelism=1,
+)
 
 
 ACCESS_TOKEN_EXPIRY = 3600
 
+# Built once: jwt.encode would create a new PyJWT wrapper and run its
+# claim checks and stdlib JSON encoding on every token minted
+_jws = jwt.PyJWS(algorithms=[Config.JWT_ALGORITHM])
+
 
+# Both helpers are CPU-bound for tens of milliseconds; call them from async
+# code through asyncio.to_thread so the event loop keeps serving requests.
 def generate_passwd_hash(password: str) -> str:
     """Generate a bcrypt hash safely, even for long passwords."""
     # Step 1: Pre-hash with SHA256 (always 32 bytes)
@@ -34,15 +51,17 @@ def create_access_token(
     payload = {}
 
     payload["user"] = user_data
-    payload["exp"] = datetime.now() + (
-        expiry if expiry is not None else timedelta(seconds=ACCESS_TOKEN_EXPIRY)
+    # Unix seconds directly; a naive datetime.now() would be read as UTC by PyJWT
+    payload["exp"] = int(time.time()) + (
+        int(expiry.total_seconds()) if expiry is not None else ACCESS_TOKEN_EXPIRY
     )
-    payload["jti"] = str(uuid.uuid4())
+    payload["jti"] = uuid.uuid4().hex
 
     payload["refresh"] = refresh
 
-    token = jwt.encode(
-        payload=payload, key=Config.JWT_SECRET, algorithm=Config.JWT_ALGORITHM
+    # orjson emits the same compact JSON as jwt.encode, so tokens are unchanged
+    token = _jws.encode(
+        orjson.dumps(payload), key=Config.JWT_SECRET, algorithm=Config.JWT_ALGORITHM
     )
 
     return token
@@ -61,8 +80,58 @@ def decode_token(token: str) -> dict:
         return None
 
 
+# Verified token payloads, keyed by a 16-byte digest of the token. Entries live
+# for at most TOKEN_CACHE_TTL seconds and never past the token's own exp.
+# Revocation is unaffected: callers still check the jti blocklist every time.
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_MAX = 10_000
+_token_cache: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+
+
+def _copy_payload(token_data: dict) -> dict:
+    """Copy of a cached payload, including the nested "user" claims, so no
+    request can mutate the dict that other requests with the same token share
+    """
+    return {k: dict(v) if isinstance(v, dict) else v for k, v in token_data.items()}
+
+
+def decode_token_cached(token: str) -> dict:
+    """decode_token() with a small in-process TTL cache in front of it.
+
+    Only touched from the event loop thread, so no locking is needed.
+    """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    now = time.time()
+
+    entry = _token_cache.get(key)
+    if entry is not None:
+        expires_at, token_data = entry
+        if expires_at > now:
+            return _copy_payload(token_data)
+        del _token_cache[key]
+
+    token_data = decode_token(token)
+    if token_data is not None:
+        _token_cache[key] = (min(now + TOKEN_CACHE_TTL, token_data["exp"]), token_data)
+        if len(_token_cache) > TOKEN_CACHE_MAX:
+            _token_cache.popitem(last=False)  # drop the oldest entry
+        return _copy_payload(token_data)
+
+    return token_data
+
+
+class _OrjsonSerializer:
+    """orjson adapter for itsdangerous; produces the same compact JSON as its default"""
+
+    @staticmethod
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    loads = staticmethod(orjson.loads)
+
+
 serializer = URLSafeTimedSerializer(
-    secret_key=Config.JWT_SECRET, salt="email-configuration"
+    secret_key=Config.JWT_SECRET, salt="email-configuration", serializer=_OrjsonSerializer
 )
 
 
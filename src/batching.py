@@ -0,0 +1,72 @@
+"""
+Windowed batching for background writers
+Coalesces items submitted from concurrent requests into batches
+"""
+import asyncio
+from typing import Any, List, Optional
+
+
+class AsyncBatcher:
+    """Drains queued items into batches and hands each batch to _flush().
+
+    A batch is flushed BATCH_WINDOW seconds after its first item arrives, or
+    as soon as BATCH_MAX items are pending. Subclasses set both limits,
+    implement _flush() and expose their own submit method on top of _put().
+    """
+
+    BATCH_MAX = 100
+    BATCH_WINDOW = 0.02  # seconds
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the flush worker on the running event loop (idempotent)"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            # A restarted worker keeps the existing queue, so items queued
+            # before the previous worker ended are still flushed
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush pending items and stop the worker"""
+        if self._worker is None or self._worker.done():
+            return
+        self._queue.put_nowait(None)
+        await self._worker
+        self._worker = None
+
+    def _put(self, item: Any) -> None:
+        """Queue an item for the next batch, starting the worker if needed"""
+        self.start()
+        self._queue.put_nowait(item)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.BATCH_WINDOW
+            while len(batch) < self.BATCH_MAX:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Any]) -> None:
+        raise NotImplementedError("Please Override this method in child classes")
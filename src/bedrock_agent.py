@@ -2,16 +2,20 @@
 AWS Bedrock service integration module
 Handles AI model interactions using AWS Bedrock
 """
-import json
+import asyncio
 import logging
+import threading
 import boto3
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, BotoCoreError
 from src.config import Config as settings
+from src.logger import setup_logger
 
-# Setup logger
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# Setup module logger; handlers are shared on the root logger
+logger = setup_logger(__name__)
 
 class BedrockAgent:
     """AWS Bedrock service client for AI model interactions"""
@@ -23,29 +27,58 @@ class BedrockAgent:
         self.temperature = settings.BEDROCK_TEMPERATURE
         self.aws_region = settings.AWS_REGION
         self._client = None
+        self._control_client = None
+        # process_request runs in worker threads; guards the one-time client creation
+        self._client_lock = threading.Lock()
+        # Dedicated threads for the blocking invoke_model calls, sized together
+        # with the client's connection pool. The default executor is shared with
+        # every other to_thread call and only has min(32, cpus + 4) threads.
+        self.max_concurrency = settings.BEDROCK_MAX_CONCURRENCY
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="bedrock"
+        )
     
     @property
     def client(self):
         """Lazy initialization of Bedrock client"""
         if self._client is None:
-            try:
-                self._client = boto3.client(
-                    service_name='bedrock-runtime',
-                    region_name=self.aws_region,
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-                )
-                logger.info(f"✅ Bedrock client initialized for region: {self.aws_region}")
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize Bedrock client: {str(e)}")
-                raise
+            with self._client_lock:
+                if self._client is None:
+                    try:
+                        self._client = boto3.client(
+                            service_name='bedrock-runtime',
+                            region_name=self.aws_region,
+                            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                            # One pooled connection per executor thread (botocore defaults to 10)
+                            config=BotoConfig(max_pool_connections=self.max_concurrency),
+                        )
+                        logger.info(f"✅ Bedrock client initialized for region: {self.aws_region}")
+                    except Exception as e:
+                        logger.error(f"❌ Failed to initialize Bedrock client: {str(e)}")
+                        raise
         return self._client
     
+    @property
+    def control_client(self):
+        """Lazy initialization of the Bedrock control-plane client (model listing)"""
+        if self._control_client is None:
+            with self._client_lock:
+                if self._control_client is None:
+                    self._control_client = boto3.client(
+                        'bedrock', 
+                        region_name=self.aws_region,
+                        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
+                    )
+        return self._control_client
+    
     def process_request(self, user_query: str) -> Dict[str, Any]:
         """Process user query with AWS Bedrock and return response"""
         try:
-            logger.info(f"🔄 Processing query with Bedrock model: {self.model_id}")
-            logger.debug(f"Query: {user_query[:100]}...")
+            logger.info("🔄 Processing query with Bedrock model: %s", self.model_id)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Query: %s...", user_query[:100])
             
             # Prepare the request payload for Anthropic Claude model
             body = {
@@ -62,21 +95,21 @@ class BedrockAgent:
             
             # Call Bedrock
             response = self.client.invoke_model(
-                body=json.dumps(body),
+                body=orjson.dumps(body),
                 modelId=self.model_id,
                 accept="application/json",
                 contentType="application/json"
             )
             
-            # Parse response
-            response_body = json.loads(response.get('body').read())
+            # Parse response; orjson reads the body bytes without decoding to str first
+            response_body = orjson.loads(response.get('body').read())
             
             # Extract the AI response text
             if 'content' in response_body and len(response_body['content']) > 0:
                 bedrock_response = response_body['content'][0]['text']
                 
                 logger.info("✅ Bedrock processing successful")
-                logger.debug(f"Response length: {len(bedrock_response)} characters")
+                logger.debug("Response length: %d characters", len(bedrock_response))
                 
                 return {
                     "success": True,
@@ -114,17 +147,16 @@ class BedrockAgent:
                 "response": "I'm sorry, I encountered an unexpected error while processing your request."
             }
     
+    async def aprocess_request(self, user_query: str) -> Dict[str, Any]:
+        """process_request on the Bedrock executor, without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.process_request, user_query)
+
     def health_check(self) -> Dict[str, Any]:
         
         try:
             # Try to list foundation models as a health check
-            bedrock_client = boto3.client(
-                'bedrock', 
-                region_name=self.aws_region,
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-            )
-            response = bedrock_client.list_foundation_models()
+            response = self.control_client.list_foundation_models()
             
             # Check if our model is available
             available_models = [model['modelId'] for model in response.get('modelSummaries', [])]
@@ -1,6 +1,11 @@
+import asyncio
 from celery import Celery
+from src.batching import AsyncBatcher
 from src.mail import mail, create_message
 from asgiref.sync import async_to_sync
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
 
 c_app = Celery()
 
@@ -14,3 +19,66 @@ def send_email(recipients: list[str], subject: str, body: str):
 
     async_to_sync(mail.send_message)(message)
     print("Email sent")
+
+
+async def _send_messages(batch: list[list]) -> int:
+    sent = 0
+    for recipients, subject, body in batch:
+        try:
+            await mail.send_message(create_message(recipients=recipients, subject=subject, body=body))
+            sent += 1
+        except Exception as e:
+            # One bad address must not drop the rest of the batch
+            logger.error("Failed to send email to %s: %s", recipients, e)
+    return sent
+
+
+# Acked on receipt, unlike the global acks_late: redelivering a half-sent
+# batch would resend every email already delivered, and per-message
+# failures are caught in _send_messages so there is nothing to retry
+@c_app.task(acks_late=False)
+def send_email_bulk(batch: list[list]):
+    """Send several [recipients, subject, body] emails from one task"""
+    sent = async_to_sync(_send_messages)(batch)
+    logger.info("Sent %d/%d emails", sent, len(batch))
+
+
+class EmailBatcher(AsyncBatcher):
+    """Coalesces outgoing emails into send_email_bulk tasks.
+
+    Emails enqueued within BATCH_WINDOW seconds of each other (up to
+    BATCH_MAX) are published to the broker as one task, so a burst of
+    signups costs one broker round trip instead of one per email.
+    enqueue() returns once that publish has succeeded.
+    """
+
+    BATCH_MAX = 32
+    BATCH_WINDOW = 0.05  # seconds
+
+    async def enqueue(self, recipients: list[str], subject: str, body: str) -> None:
+        """Queue an email and wait until the batch containing it is published.
+
+        Raises the broker error if publishing fails, so callers never report
+        an email as sent when it was dropped.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._put(([recipients, subject, body], future))
+        await future
+
+    async def _flush(self, batch: list[tuple]) -> None:
+        try:
+            # Publishing talks to the broker synchronously, so keep it off the event loop
+            await asyncio.to_thread(send_email_bulk.apply_async, args=[[email for email, _ in batch]])
+        except Exception as e:
+            logger.error("Failed to queue %d emails: %s", len(batch), e)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            logger.debug("Queued %d emails", len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+
+email_batcher = EmailBatcher()
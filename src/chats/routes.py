@@ -1,5 +1,6 @@
 # Chat routes
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query
+from fastapi.responses import ORJSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List, Dict, Any, Optional
 from .schemas import ChatRequest, ChatResponse
@@ -17,6 +18,7 @@ chat_service = ChatService()
 @chat_router.post("/", response_model=ChatResponse)
 async def send_message(
     request: ChatRequest,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session)
 ):   
     """Send a message and get AI response from Bedrock"""
@@ -25,7 +27,8 @@ async def send_message(
         user_query=request.user_input,
         session=session,
         chat_id=request.chat_id,
-        message_uid=request.message_uid
+        message_uid=request.message_uid,
+        background_tasks=background_tasks
     )
     
     # Check if response indicates an error
@@ -35,7 +38,7 @@ async def send_message(
             detail=response.get("error", "Internal server error")
         )
     
-    return response
+    return ChatResponse.model_validate(response)
     
 
 @chat_router.get("/health")
@@ -45,12 +48,12 @@ async def chat_health_check():
         # Check if Bedrock service is available
         bedrock_status = "available" if chat_service else "unavailable"
         
-        return {
+        return ORJSONResponse({
             "status": "healthy",
             "service": "chat",
             "bedrock_service": bedrock_status,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
+            "timestamp": datetime.now(timezone.utc)
+        })
     except Exception as e:
         logger.error(f"Chat health check failed: {e}")
         return {
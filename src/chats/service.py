@@ -1,12 +1,16 @@
 # Chat service implementation
 from typing import Dict, Any, Optional, List
+from collections import defaultdict, deque
 import logging
+import time
 import uuid
 from datetime import datetime, timezone
+from fastapi import BackgroundTasks, HTTPException, status
+from redis.exceptions import RedisError
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
 from src.bedrock_agent import bedrock_agent
-from src.db.models import Chats
+from src.db.models import uuid7
+from src.db.redis import hit_rate_limit
 from src.logger import setup_logger
 from src.history.service import ChatHistoryService 
 
@@ -19,10 +23,18 @@ class ChatService:
     def __init__(self):
         self.rate_limit = 10  # requests per minute
         self.rate_limit_window = 60  # seconds
+        # Fallback for when Redis is down: per-user timestamps (monotonic seconds)
+        # of recently allowed requests. Only the last `rate_limit` entries can
+        # matter, so each deque is capped there.
+        self._request_log: dict[str, deque[float]] = defaultdict(
+            lambda: deque(maxlen=self.rate_limit)
+        )
 
-    async def _check_rate_limit(self, user_id: str, session: AsyncSession) -> tuple[bool, int]:
+    async def _check_rate_limit(self, user_id: str, now: Optional[float] = None) -> tuple[bool, int]:
         """
-        Check if user has exceeded rate limit
+        Check if user has exceeded rate limit using a sliding window in Redis,
+        shared by all workers. Falls back to this process's own window if
+        Redis is unreachable. now is the request's unix time, if already read.
         Returns: (is_allowed, requests_count)
         """
         if not user_id or user_id == "anonymous":
@@ -30,23 +42,33 @@ class ChatService:
             return True, 0
 
         try:
-            # Get recent requests in window
-            from datetime import timedelta
-            window_start = datetime.now(timezone.utc) - timedelta(seconds=self.rate_limit_window)
-            
-            statement = select(Chats).where(
-                Chats.user_id == user_id,
-                Chats.created_at >= window_start
+            is_allowed, recent_requests = await hit_rate_limit(
+                user_id, self.rate_limit, self.rate_limit_window, now=now
             )
-            result = await session.exec(statement)
-            recent_requests = len(result.scalars().all())
-            
-            logger.debug(f"Rate limit check for {user_id}: {recent_requests}/{self.rate_limit} requests")
-            return recent_requests < self.rate_limit, recent_requests
-        except Exception as e:
-            logger.error(f"Rate limit check failed: {e}", exc_info=True)
-            # Allow request if rate limit check fails
-            return True, 0
+        except RedisError as e:
+            logger.warning(f"Redis rate limiter unavailable, using local window: {e}")
+            return self._check_local_rate_limit(user_id)
+
+        logger.debug("Rate limit check for %s: %d/%d requests", user_id, recent_requests, self.rate_limit)
+        return is_allowed, recent_requests
+
+    def _check_local_rate_limit(self, user_id: str) -> tuple[bool, int]:
+        """In-process sliding window; only covers requests served by this worker"""
+        # No await between reading and appending, so this is atomic on the event loop
+        now = time.monotonic()
+        window_start = now - self.rate_limit_window
+        requests = self._request_log[user_id]
+        # Full log whose oldest entry is still inside the window: limit reached.
+        # Checked before trimming so a saturated user costs O(1).
+        if len(requests) == self.rate_limit and requests[0] > window_start:
+            return False, self.rate_limit
+
+        while requests and requests[0] <= window_start:
+            requests.popleft()
+
+        recent_requests = len(requests)
+        requests.append(now)
+        return True, recent_requests
 
     async def process_chat_request(
         self,
@@ -54,17 +76,20 @@ class ChatService:
         user_query: str,
         chat_id: Optional[str] = None,
         user_id: str = "anonymous",
-        message_uid: Optional[str] = None
+        message_uid: Optional[str] = None,
+        background_tasks: Optional[BackgroundTasks] = None
     ) -> Dict[str, Any]:
         
-        logger.info(f"🤖 Processing chat request")
-        logger.debug(f"Query length: {len(user_query)} chars")
-        logger.debug(f"chat_id: {chat_id}, message_uid: {message_uid}")
+        logger.info("🤖 Processing chat request")
+        logger.debug("Query length: %d chars", len(user_query))
+        logger.debug("chat_id: %s, message_uid: %s", chat_id, message_uid)
         
+        # The clock is read once per request, for the rate limit and the metadata
+        now_ts = time.time()
+
         try:
             # Check rate limit
-            from fastapi import HTTPException, status
-            is_allowed, request_count = await self._check_rate_limit(user_id, session)
+            is_allowed, request_count = await self._check_rate_limit(user_id, now=now_ts)
             
             if not is_allowed:
                 logger.warning(f"Rate limit exceeded for user {user_id}: {request_count}/{self.rate_limit}")
@@ -75,20 +100,37 @@ class ChatService:
 
             logger.debug("✅ Rate limit check passed")
 
-            # Generate required IDs for table structure
-            chat_id = chat_id or str(uuid.uuid4())
-            message_uid = message_uid or str(uuid.uuid4())
-            response_session_id = str(uuid.uuid4())  # Backend generates this
+            # Generate required IDs for table structure. They stay uuid.UUID objects
+            # for the database and metadata and are only stringified for the response.
+            try:
+                chat_uuid = uuid.UUID(chat_id) if chat_id else uuid7()
+                message_uuid = uuid.UUID(message_uid) if message_uid else uuid7()
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="chat_id and message_uid must be valid UUIDs"
+                )
+            response_session_uuid = uuid7()  # Backend generates this
+            now = datetime.fromtimestamp(now_ts, timezone.utc)
             
-            logger.debug(f"Generated IDs - chat_id: {chat_id}, message_uid: {message_uid}, response_session_id: {response_session_id}")
+            logger.debug(
+                "Generated IDs - chat_id: %s, message_uid: %s, response_session_id: %s",
+                chat_uuid, message_uuid, response_session_uuid
+            )
             # Process request with Bedrock
             logger.info("🔄 Processing request with Bedrock...")
             
-            # Call Bedrock service - returns question and response
-            result = bedrock_agent.process_request(user_query)
+            # Call Bedrock service - returns question and response.
+            # invoke_model is a blocking boto3 call, so it runs on the agent's own
+            # thread pool to keep the event loop serving other requests meanwhile.
+            result = await bedrock_agent.aprocess_request(user_query)
             
             logger.info("✅ Bedrock processing completed")
-            logger.debug(f"Bedrock result: question={result.get('question', '')[:50]}..., success={result.get('success')}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Bedrock result: question=%s..., success=%s",
+                    result.get('question', '')[:50], result.get('success')
+                )
 
             if result and result.get("success"):
                 # Process the question and response returned by Bedrock
@@ -97,47 +139,57 @@ class ChatService:
                 
                 response = {
                     "response": bedrock_response,
-                    "chat_id": chat_id,
-                    "message_uid": message_uid,
-                    "response_session_id": response_session_id,
+                    "chat_id": chat_id or str(chat_uuid),
+                    "message_uid": message_uid or str(message_uuid),
+                    "response_session_id": str(response_session_uuid),
                     "metadata": {
                         "question": question,
                         "bedrock_processed": True,
-                        "chat_id": chat_id,
-                        "message_uid": message_uid,
-                        "response_session_id": response_session_id,
+                        "chat_id": chat_uuid,
+                        "message_uid": message_uuid,
+                        "response_session_id": response_session_uuid,
                         "user_id": user_id,
-                        "timestamp": datetime.now(timezone.utc).isoformat()
+                        "timestamp": now
                     },
                     "status": "success"
                 }
 
                 # Persist conversation to database
-                try:
+                persist_kwargs = dict(
                     # Use the question and response from Bedrock processing
-                    persisted = await history_service.persist(
-                        user_id=user_id,
-                        chat_id=chat_id,
-                        user_input=question,
-                        response=bedrock_response,  # Changed from bedrock_response
-                        message_uid=message_uid,  # NEW
-                        response_session_id=response_session_id,  # NEW
-                        chat_metadata=response.get("metadata", {}),
-                        session=session
+                    user_id=user_id,
+                    chat_id=chat_uuid,
+                    user_input=question,
+                    response=bedrock_response,  # Changed from bedrock_response
+                    message_uid=message_uuid,  # NEW
+                    response_session_id=response_session_uuid,  # NEW
+                    chat_metadata=response.get("metadata", {}),
+                )
+
+                if background_tasks is not None:
+                    # Record ID is generated up front so it can be returned before the INSERT runs
+                    record_id = uuid7()
+                    background_tasks.add_task(
+                        history_service.persist_in_background,
+                        record_id=record_id,
+                        **persist_kwargs
                     )
+                    response["response_id"] = str(record_id)
+                else:
+                    try:
+                        persisted = await history_service.persist(session=session, **persist_kwargs)
 
-                    response["response_id"] = persisted.get("id")
-                    logger.info(f"✅ Conversation persisted with ID: {persisted.get('id')}")
-                except Exception as e:
-                    logger.exception(f"Failed to persist conversation: {e}; continuing to return response")
+                        response["response_id"] = persisted.get("id")
+                        logger.info("✅ Conversation persisted with ID: %s", persisted.get('id'))
+                    except Exception as e:
+                        logger.exception(f"Failed to persist conversation: {e}; continuing to return response")
                 
                 return response
 
             # Handle case where Bedrock processing failed
             logger.warning("⚠️ Bedrock processing failed or returned invalid response")
-            from fastapi import HTTPException, status as http_status
             raise HTTPException(
-                status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=result.get("error", "Failed to process your request. Please try again.")
             )
 
@@ -146,9 +198,8 @@ class ChatService:
             raise
         except Exception as e:
             logger.error(f"Chat service error: {str(e)}", exc_info=True)
-            from fastapi import HTTPException, status as http_status
             raise HTTPException(
-                status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"An error occurred while processing your request: {str(e)}"
             )
 
@@ -5,6 +5,23 @@ from pydantic import field_validator
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Connection pool, per worker process. Size pool_size + max_overflow to
+    # cover the requests a worker holds a connection for at once; across all
+    # workers it must stay below Postgres max_connections.
+    DB_POOL_SIZE: int = 20  # Connections kept open in the pool
+    DB_MAX_OVERFLOW: int = 40  # Extra connections allowed under burst load
+    DB_POOL_TIMEOUT: int = 10  # Seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # Reopen connections older than this many seconds
+    DB_POOL_PRE_PING: bool = True  # Test connections before handing them out
+    # psycopg server-side prepares a statement after this many executions on a
+    # connection; None disables prepared statements (e.g. behind pgbouncer in
+    # transaction mode)
+    DB_PREPARE_THRESHOLD: Optional[int] = 2
+    # Set when an external pooler (pgbouncer in transaction mode) fronts the
+    # database; the engine then opens a connection per checkout instead of pooling
+    DB_USE_NULL_POOL: bool = False
+    # Optional read replica for read-only endpoints; defaults to DATABASE_URL
+    DB_RO_URL: Optional[str] = None
     
     # JWT Configuration - Optional when ENABLE_AUTH is False
     JWT_SECRET: Optional[str] = None
@@ -14,6 +31,14 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_URL: str = "redis://localhost:6379/0"
+    # Per worker process; requests wait up to REDIS_POOL_TIMEOUT seconds for a
+    # free connection instead of failing when all of them are busy
+    REDIS_MAX_CONNECTIONS: int = 200
+    REDIS_POOL_TIMEOUT: int = 5
+    # Seconds to connect / wait for a reply before raising, so an unreachable
+    # Redis fails fast into the RedisError fallbacks instead of hanging requests
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 1.0
+    REDIS_SOCKET_TIMEOUT: float = 0.5
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
     MAIL_FROM: str
@@ -35,13 +60,24 @@ class Settings(BaseSettings):
     BEDROCK_MODEL_ID: str = "anthropic.claude-3-haiku-20240307-v1:0"
     BEDROCK_MAX_TOKENS: int = 4000
     BEDROCK_TEMPERATURE: float = 0.1
+    # Concurrent Bedrock calls per worker process (threads and HTTP connections)
+    BEDROCK_MAX_CONCURRENCY: int = 32
 
     # Logging Configuration
     LOG_LEVEL: str = "INFO"
+    DEBUG_SQL: bool = False  # Echo every SQL statement (very verbose)
     
-    # CORS Configuration
-    ALLOWED_ORIGINS: str = '["http://localhost:5173", "http://localhost:5174"]'
+    # CORS Configuration (env value is a JSON array, parsed when Settings is built)
+    ALLOWED_ORIGINS: list[str] = ["http://localhost:5173", "http://localhost:5174"]
     
+    @field_validator('DB_PREPARE_THRESHOLD', mode='before')
+    @classmethod
+    def parse_prepare_threshold(cls, v):
+        """An empty DB_PREPARE_THRESHOLD= disables prepared statements (None)"""
+        if isinstance(v, str) and not v.strip():
+            return None
+        return v
+
     @field_validator('JWT_SECRET')
     @classmethod
     def validate_jwt_secret(cls, v, info):
@@ -51,20 +87,6 @@ class Settings(BaseSettings):
         if enable_auth and not v:
             raise ValueError('JWT_SECRET is required when ENABLE_AUTH=True')
         return v
-    
-    @field_validator('ALLOWED_ORIGINS')
-    @classmethod
-    def parse_origins(cls, v):
-        """Parse ALLOWED_ORIGINS string to list"""
-        import json
-        try:
-            origins = json.loads(v)
-            if not isinstance(origins, list):
-                raise ValueError("ALLOWED_ORIGINS must be a JSON array")
-            return origins
-        except json.JSONDecodeError as e:
-            # Fallback to default on parse error
-            return ["http://localhost:5173", "http://localhost:5174"]
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -75,3 +97,14 @@ Config = Settings()
 broker_url = Config.REDIS_URL
 result_backend = Config.REDIS_URL
 broker_connection_retry_on_startup = True
+# Email sends are slow, uneven network calls: hand a worker one task at a
+# time so a burst doesn't queue up behind a single slow SMTP send, and only
+# ack after the send so a crashed worker's single email is redelivered
+# (send_email_bulk opts out, see its definition)
+worker_prefetch_multiplier = 1
+task_acks_late = True
+task_reject_on_worker_lost = True
+task_routes = {
+    "src.celery_tasks.send_email": {"queue": "emails"},
+    "src.celery_tasks.send_email_bulk": {"queue": "emails"},
+}
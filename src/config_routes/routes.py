@@ -2,11 +2,39 @@
 Frontend Configuration Endpoint
 Provides frontend-safe configuration without exposing secrets
 """
+import orjson
 from fastapi import APIRouter
+from fastapi.responses import Response
 from src.config import Config as settings
 
 config_router = APIRouter()
 
+# Construct base URL from domain
+_protocol = "https" if settings.DOMAIN and not settings.DOMAIN.startswith("localhost") else "http"
+_base_url = f"{_protocol}://{settings.DOMAIN}" if settings.DOMAIN else "http://localhost:8000"
+
+# Derived from settings only, so it is built and serialized once at import
+_FRONTEND_CONFIG = {
+    "api_base_url": _base_url,
+    "app_name": "Security Assistant",
+    "app_version": "2.0.0",
+    "require_auth": False,  # Set to True when auth is enforced
+    "enable_auth": True,    # Auth endpoints are available
+    "features": {
+        "email_verification": True,
+        "password_reset": True,
+        "chat_history": True,
+        "bedrock_ai": True,
+        "anonymous_chat": True
+    },
+    "limits": {
+        "max_message_length": 4000,
+        "cache_duration_seconds": 30
+    }
+}
+_FRONTEND_CONFIG_BODY = orjson.dumps(_FRONTEND_CONFIG)
+_FRONTEND_CONFIG_HEADERS = {"Cache-Control": "public, max-age=3600"}
+
 
 @config_router.get("/frontend")
 async def get_frontend_config():
@@ -23,25 +51,8 @@ async def get_frontend_config():
             - enable_auth: Whether authentication is enabled
             - features: Available features
     """
-    # Construct base URL from domain
-    protocol = "https" if settings.DOMAIN and not settings.DOMAIN.startswith("localhost") else "http"
-    base_url = f"{protocol}://{settings.DOMAIN}" if settings.DOMAIN else "http://localhost:8000"
-    
-    return {
-        "api_base_url": base_url,
-        "app_name": "Security Assistant",
-        "app_version": "2.0.0",
-        "require_auth": False,  # Set to True when auth is enforced
-        "enable_auth": True,    # Auth endpoints are available
-        "features": {
-            "email_verification": True,
-            "password_reset": True,
-            "chat_history": True,
-            "bedrock_ai": True,
-            "anonymous_chat": True
-        },
-        "limits": {
-            "max_message_length": 4000,
-            "cache_duration_seconds": 30
-        }
-    }
+    return Response(
+        content=_FRONTEND_CONFIG_BODY,
+        media_type="application/json",
+        headers=_FRONTEND_CONFIG_HEADERS,
+    )
@@ -2,7 +2,8 @@
 import sys
 import asyncio
 import logging
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
+import orjson
 import sqlalchemy as sa
 
 # Ensure Windows compatibility for psycopg
@@ -10,6 +11,7 @@ if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.logger import setup_logger
 from src.config import Config as settings
@@ -19,26 +21,52 @@ logger = setup_logger(__name__)
 
 logger.info("Initializing database configuration")
 
-# Get database URL from settings (handles SSM, env vars, and SSL configuration)
+# Get database URL from settings (read from env vars / .env by pydantic-settings)
 db_url = settings.DATABASE_URL
 
 # Production database configuration with async engine
 logger.info("Creating async database engine...")
-logger.debug(f"Echo SQL: True")
-
-engine = create_async_engine(
-    db_url,
-    echo=True,  # SQL query logging for debugging
-    pool_pre_ping=True,  # Test connections before using them
-    pool_size=5,  # Maximum number of connections to keep in pool
-    max_overflow=10,  # Maximum overflow size for connection pool
-    pool_recycle=3600,  # Recycle connections after 1 hour
-    pool_timeout=30,  # Timeout for getting connection from pool
-    connect_args={
-        "options": "-c application_name=bedrock-backend",
-        "connect_timeout": 10,  # Connection timeout in seconds
-    }
-)
+
+
+def _json_serializer(value: Any) -> str:
+    """Encode JSON/JSONB bind values with orjson (handles datetime and UUID natively)"""
+    return orjson.dumps(value).decode()
+
+logger.debug(f"Echo SQL: {settings.DEBUG_SQL}")
+
+def _create_engine(url: str):
+    """Async engine with the shared pool, JSON and connection settings"""
+    if settings.DB_USE_NULL_POOL:
+        # An external pooler (pgbouncer in transaction mode) owns the
+        # connections, so don't hold any here
+        pool_kwargs = {"poolclass": NullPool}
+    else:
+        pool_kwargs = {
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,  # Test connections before using them
+            "pool_size": settings.DB_POOL_SIZE,  # Maximum number of connections to keep in pool
+            "max_overflow": settings.DB_MAX_OVERFLOW,  # Maximum overflow size for connection pool
+            "pool_recycle": settings.DB_POOL_RECYCLE,  # Recycle connections older than this (seconds)
+            "pool_use_lifo": True,  # Reuse the most recently returned connection first
+            "pool_timeout": settings.DB_POOL_TIMEOUT,  # Timeout for getting connection from pool
+        }
+
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG_SQL,  # SQL query logging, off unless DEBUG_SQL is set
+        json_serializer=_json_serializer,
+        json_deserializer=orjson.loads,
+        connect_args={
+            # JIT compilation only adds planning latency for these short OLTP queries
+            "options": "-c application_name=bedrock-backend -c jit=off",
+            "connect_timeout": 10,  # Connection timeout in seconds
+            # The history queries repeat the same few shapes, so prepare them early
+            "prepare_threshold": settings.DB_PREPARE_THRESHOLD,
+        },
+        **pool_kwargs,
+    )
+
+
+engine = _create_engine(db_url)
 
 logger.info("Database engine created successfully")
 
@@ -52,6 +80,20 @@ SessionLocal = async_sessionmaker(
 )
 logger.info("Async session factory configured")
 
+# Optional read replica for read-only endpoints; falls back to the primary
+if settings.DB_RO_URL:
+    logger.info("Creating read-only database engine...")
+    ro_engine = _create_engine(settings.DB_RO_URL)
+    ROSessionLocal = async_sessionmaker(
+        bind=ro_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False
+    )
+else:
+    ro_engine = engine
+    ROSessionLocal = SessionLocal
+
 async def init_db():
     """Initialize database tables with timeout protection"""
     try:
@@ -71,15 +113,14 @@ async def init_db():
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    """Get async database session dependency for FastAPI"""
-    logger.debug("Creating new async database session...")
-    
+    """Get async database session dependency for FastAPI.
+
+    Does not commit: code that writes commits its own changes, so read-only
+    requests skip the COMMIT round trip.
+    """
     async with SessionLocal() as session:
         try:
-            logger.debug(f"Async session created: {id(session)}")
             yield session
-            logger.debug(f"Async session {id(session)} yielded successfully")
-            await session.commit()
         except Exception as e:
             logger.error(f"Error during session usage: {str(e)}", exc_info=True)
             logger.error(f"Session ID: {id(session)}")
@@ -88,3 +129,15 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         finally:
             await session.close()
 
+
+async def get_ro_session() -> AsyncGenerator[AsyncSession, None]:
+    """Read-only session dependency, served by DB_RO_URL when it is set.
+
+    Replicas can lag the primary, so only use this where slightly stale
+    reads are acceptable.
+    """
+    async with ROSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -1,31 +1,80 @@
 # Database models for chat history
 from __future__ import annotations
+import os
+import time
 import uuid
 from datetime import datetime
 from typing import Optional
 import sqlalchemy.dialects.postgresql as pg
+from sqlalchemy import Index, func, text
 from sqlmodel import SQLModel, Field, Column
 
 
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (RFC 9562 version 7): 48-bit unix ms timestamp + random bits.
+
+    Consecutive IDs sort by creation time, so primary-key inserts append to the
+    right edge of the btree instead of landing on random pages.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
 class Chats(SQLModel, table=True):
     __tablename__ = "chats"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Per-user history, newest first, keyset-paged by (created_at, id)
+        Index(
+            "ix_chats_user_created_id", "user_id", text("created_at DESC"), text("id DESC"),
+            postgresql_include=["chat_id"],
+        ),
+        # Messages of one chat in order, keyset-paged by (created_at, id)
+        Index("ix_chats_chat_created_id", "chat_id", "created_at", "id"),
+        # Broad time-range scans; BRIN stays tiny because rows arrive in created_at order
+        Index(
+            "idx_chats_created_brin", "created_at",
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32},
+        ),
+        # Containment (@>) filters on chat_metadata
+        Index(
+            "ix_chats_meta_gin", "chat_metadata",
+            postgresql_using="gin", postgresql_ops={"chat_metadata": "jsonb_path_ops"},
+        ),
+        {'extend_existing': True},
+    )
+    # Server-filled columns (created_at, updated_at) come back through INSERT/UPDATE
+    # ... RETURNING instead of a lazy SELECT when first read
+    __mapper_args__ = {"eager_defaults": True}
     
     id: uuid.UUID = Field(
-        sa_column=Column(pg.UUID, primary_key=True, nullable=False, default=uuid.uuid4)
+        sa_column=Column(
+            pg.UUID, primary_key=True, nullable=False,
+            default=uuid7, server_default=text("gen_random_uuid()")
+        )
     )
-    chat_id: uuid.UUID = Field(sa_column=Column(pg.UUID, nullable=False, index=True))
-    user_id: str = Field(sa_column=Column(pg.VARCHAR(255), nullable=False, index=True))
+    # chat_id and user_id lead the composite indexes above, which cover their lookups
+    chat_id: uuid.UUID = Field(sa_column=Column(pg.UUID, nullable=False))
+    user_id: str = Field(sa_column=Column(pg.VARCHAR(255), nullable=False))
     message_uid: Optional[uuid.UUID] = Field(sa_column=Column(pg.UUID, nullable=True, index=True))
     response_session_id: Optional[uuid.UUID] = Field(sa_column=Column(pg.UUID, nullable=True))
     user_input: str
-    response: Optional[str] = None  # Changed from bedrock_response to response
-    chat_metadata: Optional[dict] = Field(sa_column=Column(pg.JSONB), default=None)
+    # Changed from bedrock_response to response. Compressed with lz4 on PG14+
+    # (see migration chats_response_lz4); SQLAlchemy has no column option for it.
+    response: Optional[str] = None
+    chat_metadata: dict = Field(
+        sa_column=Column(pg.JSONB, nullable=False, server_default=text("'{}'::jsonb")),
+        default_factory=dict
+    )
+    # Timestamps are filled in by Postgres (UTC, timezone-aware)
     created_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP, default=datetime.now, nullable=False, index=True)
+        sa_column=Column(pg.TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     )
     updated_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP, default=datetime.now, onupdate=datetime.now, nullable=False)
+        sa_column=Column(
+            pg.TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+        )
     )
     def __repr__(self):
         return f"<Chat {self.chat_id}>"
@@ -34,8 +83,15 @@ class Chats(SQLModel, table=True):
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
+    __table_args__ = (
+        # Case-insensitive email lookups and the signup ON CONFLICT target
+        Index("ix_users_email", func.lower(text("email")), unique=True),
+    )
+    __mapper_args__ = {"eager_defaults": True}
     uid: uuid.UUID = Field(
-        sa_column=Column(pg.UUID, nullable=False, primary_key=True, default=uuid.uuid4)
+        sa_column=Column(
+            pg.UUID, nullable=False, primary_key=True, server_default=text("gen_random_uuid()")
+        )
     )
     username: str
     email: str
@@ -48,8 +104,12 @@ class User(SQLModel, table=True):
     password_hash: str = Field(
         sa_column=Column(pg.VARCHAR, nullable=False), exclude=True
     )
-    created_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
-    updated_at: datetime = Field(sa_column=Column(pg.TIMESTAMP, default=datetime.now))
+    created_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP(timezone=True), server_default=func.now())
+    )
+    updated_at: datetime = Field(
+        sa_column=Column(pg.TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now())
+    )
 
     def __repr__(self):
         return f"<User {self.username}>"
\ No newline at end of file
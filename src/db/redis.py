@@ -1,19 +1,129 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
 import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
 from src.config import Config
 
 JTI_EXPIRY = 3600
 
-# token_blocklist = redis.Redis(host=Config.REDIS_HOST, port=Config.REDIS_PORT, db=0)
+# jtis recently confirmed as not revoked, mapped to when that answer expires.
+# Saves a Redis round trip per authenticated request for a repeat token; a
+# logout on another worker takes up to NOT_BLOCKLISTED_TTL seconds to apply.
+NOT_BLOCKLISTED_TTL = 1.0
+NOT_BLOCKLISTED_MAX = 10_000
+_not_blocklisted: "OrderedDict[str, float]" = OrderedDict()
+
+
+class _BlockingConnectionPool(redis.BlockingConnectionPool):
+    """BlockingConnectionPool that connects outside the pool lock.
+
+    redis 5.0.1 connects while holding the pool's condition lock, and on a
+    failed connect release() waits for that same lock, so every connection
+    error stalls for the full pool timeout instead of raising within the
+    socket timeouts.
+    """
+
+    async def get_connection(self, command_name, *keys, **options):
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with self._condition:
+                    await self._condition.wait_for(self.can_get_connection)
+                    try:
+                        connection = self._available_connections.pop()
+                    except IndexError:
+                        connection = self.make_connection()
+                    self._in_use_connections.add(connection)
+        except asyncio.TimeoutError as err:
+            raise RedisConnectionError("No connection available.") from err
+
+        try:
+            await self.ensure_connection(connection)
+        except BaseException:
+            await self.release(connection)
+            raise
+        return connection
+
+
+_pool = _BlockingConnectionPool.from_url(
+    Config.REDIS_URL,
+    max_connections=Config.REDIS_MAX_CONNECTIONS,
+    timeout=Config.REDIS_POOL_TIMEOUT,
+    socket_connect_timeout=Config.REDIS_SOCKET_CONNECT_TIMEOUT,
+    socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+    socket_keepalive=True,
+    health_check_interval=30,  # PING connections idle longer than this before reuse
+)
+token_blocklist = redis.Redis(connection_pool=_pool)
+
+
+def get_redis() -> redis.Redis:
+    """Shared Redis client, e.g. for use as a FastAPI dependency"""
+    return token_blocklist
+
+# Sliding-window log rate limiter. Trimming, counting and recording happen in
+# one atomic script, so concurrent requests (from any worker) can't both pass
+# on the same count. Returns {allowed, requests already in the window}.
+RATE_LIMIT_LUA = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('PEXPIRE', key, window)
+    return {1, count}
+end
+return {0, count}
+"""
+
+# Script objects run EVALSHA and reload the script on NOSCRIPT by themselves
+_rate_limit_script = token_blocklist.register_script(RATE_LIMIT_LUA)
+
+
+async def hit_rate_limit(
+    key: str, limit: int, window_seconds: int, now: Optional[float] = None
+) -> tuple[bool, int]:
+    """Record a request against key if it is under limit per window_seconds.
+
+    now is the request's unix time in seconds, if the caller already has it.
+    Returns (is_allowed, requests already counted in the window).
+    """
+    now_ms = int((time.time() if now is None else now) * 1000)
+    allowed, count = await _rate_limit_script(
+        keys=[f"rl:{key}"],
+        # The member only needs to be unique; two requests can share a millisecond
+        args=[now_ms, window_seconds * 1000, limit, uuid.uuid4().hex],
+    )
+    return bool(allowed), int(count)
 
-token_blocklist = redis.from_url(Config.REDIS_URL)
 
 async def add_jti_to_blocklist(jti: str) -> None:
+    _not_blocklisted.pop(jti, None)
     await token_blocklist.set(name=jti, value="", ex=JTI_EXPIRY)
 
 
 async def token_in_blocklist(jti: str) -> bool:
-    jti = await token_blocklist.get(jti)
-    return jti is not None
+    now = time.monotonic()
+    expires_at = _not_blocklisted.get(jti)
+    if expires_at is not None:
+        if expires_at > now:
+            return False
+        del _not_blocklisted[jti]
+
+    # EXISTS answers without sending the stored value back
+    if await token_blocklist.exists(jti):
+        return True
+
+    _not_blocklisted[jti] = now + NOT_BLOCKLISTED_TTL
+    if len(_not_blocklisted) > NOT_BLOCKLISTED_MAX:
+        _not_blocklisted.popitem(last=False)  # drop the oldest entry
+    return False
 
 
 # admin
@@ -1,62 +1,121 @@
 # History routes
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import Optional, List
+from typing import Any, Awaitable, Optional, List, Tuple
+from datetime import datetime
 from uuid import UUID
+import asyncio
 import logging
 
-from src.db.main import get_session
+from src.db.main import SessionLocal, get_session
 from src.auth.dependencies import get_current_user
-from .service import ChatHistoryService
+from .service import ChatHistoryService, decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 history_router = APIRouter()
 
 history_service = ChatHistoryService()
 
+
+def _parse_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, UUID]]:
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _with_total(
+    fetch: Awaitable[List[dict]], include_total: bool, **count_kwargs: Any
+) -> Tuple[List[dict], Optional[int]]:
+    """Await a page fetch and, when include_total is set, the row count alongside it.
+
+    The count runs concurrently on its own session: one AsyncSession (one
+    connection) must never be shared between concurrent tasks.
+    """
+    if not include_total:
+        return await fetch, None
+
+    async def count() -> int:
+        async with SessionLocal() as count_session:
+            return await history_service.get_conversation_count(session=count_session, **count_kwargs)
+
+    items, total = await asyncio.gather(fetch, count())
+    return items, total
+
+
+def _page_response(
+    items: List[dict], limit: int, offset: int, total: Optional[int] = None
+) -> ORJSONResponse:
+    """Build a list response from a page fetched with limit + 1 rows.
+
+    The extra row only signals has_more and is not returned. total is None
+    unless the caller asked for it with include_total.
+    """
+    has_more = len(items) > limit
+    items = items[:limit]
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+    # Returned directly: items carry pre-serialized metadata only orjson can render
+    return ORJSONResponse({
+        "items": items,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "has_more": has_more,
+        "next_cursor": next_cursor
+    })
+
+
 @history_router.get("/")
 async def get_my_chat_history(
     chat_id: Optional[str] = Query(None),
     user_id: str = Query("anonymous"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces offset"),
+    full: bool = Query(True, description="Include response text and metadata"),
+    include_total: bool = Query(False, description="Also count matching rows (capped)"),
     session: AsyncSession = Depends(get_session),
 ):
     """Get chat history for a user or specific chat"""
+    after = _parse_cursor(cursor)
     try:
         if chat_id:
             # Get specific chat history
-            items = await history_service.fetch_by_chat(
-                session=session,
-                chat_id=UUID(chat_id),
-                limit=limit,
-                offset=offset
-            )
-            total = await history_service.get_conversation_count(
-                session=session,
+            items, total = await _with_total(
+                history_service.fetch_by_chat(
+                    session=session,
+                    chat_id=UUID(chat_id),
+                    limit=limit + 1,
+                    offset=offset,
+                    full=full,
+                    after=after
+                ),
+                include_total,
                 user_id=user_id,
                 chat_id=UUID(chat_id)
             )
         else:
             # Get all user history
-            items = await history_service.fetch(
-                session=session,
-                user_id=user_id,
-                limit=limit,
-                offset=offset
-            )
-            total = await history_service.get_conversation_count(
-                session=session,
+            items, total = await _with_total(
+                history_service.fetch(
+                    session=session,
+                    user_id=user_id,
+                    limit=limit + 1,
+                    offset=offset,
+                    full=full,
+                    after=after
+                ),
+                include_total,
                 user_id=user_id
             )
-        
-        return {
-            "items": items,
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "has_more": (offset + len(items)) < total
-        }
+
+        return _page_response(items, limit, offset, total)
     except Exception as e:
         logger.error(f"Error fetching chat history: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -67,29 +126,28 @@ async def get_conversations(
     user_id: str = Query("anonymous"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces offset"),
+    full: bool = Query(True, description="Include response text and metadata"),
+    include_total: bool = Query(False, description="Also count matching rows (capped)"),
     session: AsyncSession = Depends(get_session),
 ):
     """Get all conversations for a user"""
+    after = _parse_cursor(cursor)
     try:
-        items = await history_service.fetch(
-            session=session,
-            user_id=user_id,
-            limit=limit,
-            offset=offset
-        )
-        
-        total = await history_service.get_conversation_count(
-            session=session,
+        items, total = await _with_total(
+            history_service.fetch(
+                session=session,
+                user_id=user_id,
+                limit=limit + 1,
+                offset=offset,
+                full=full,
+                after=after
+            ),
+            include_total,
             user_id=user_id
         )
-        
-        return {
-            "items": items,
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "has_more": (offset + len(items)) < total
-        }
+
+        return _page_response(items, limit, offset, total)
     except Exception as e:
         logger.error(f"Error fetching conversations: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -100,30 +158,29 @@ async def get_chat_conversations(
     chat_id: str,
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces offset"),
+    full: bool = Query(True, description="Include response text and metadata"),
+    include_total: bool = Query(False, description="Also count matching rows (capped)"),
     session: AsyncSession = Depends(get_session),
 ):
     """Get all messages in a specific chat conversation"""
+    after = _parse_cursor(cursor)
     try:
-        items = await history_service.fetch_by_chat(
-            session=session,
-            chat_id=UUID(chat_id),
-            limit=limit,
-            offset=offset
-        )
-        
-        total = await history_service.get_conversation_count(
-            session=session,
+        items, total = await _with_total(
+            history_service.fetch_by_chat(
+                session=session,
+                chat_id=UUID(chat_id),
+                limit=limit + 1,
+                offset=offset,
+                full=full,
+                after=after
+            ),
+            include_total,
             user_id="anonymous",  # Will be replaced with actual user when auth is enabled
             chat_id=UUID(chat_id)
         )
-        
-        return {
-            "items": items,
-            "total": total,
-            "limit": limit,
-            "offset": offset,
-            "has_more": (offset + len(items)) < total
-        }
+
+        return _page_response(items, limit, offset, total)
     except Exception as e:
         logger.error(f"Error fetching chat conversations: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
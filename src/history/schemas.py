@@ -1,5 +1,5 @@
 # History schemas - Matches database model and frontend expectations
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from uuid import UUID
@@ -7,6 +7,9 @@ from uuid import UUID
 
 class ConversationItem(BaseModel):
     """Single conversation item returned by history endpoints"""
+    # Allow both response and bedrock_response for backward compatibility
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
     id: str
     user_id: str
     chat_id: str
@@ -17,10 +20,6 @@ class ConversationItem(BaseModel):
     chat_metadata: Optional[Dict[str, Any]] = None  # Matches DB field name
     created_at: str
     updated_at: str
-    
-    class Config:
-        # Allow both response and bedrock_response for backward compatibility
-        populate_by_name = True
 
 
 class ConversationList(BaseModel):
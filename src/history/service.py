@@ -1,11 +1,16 @@
 # History service implementation
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
+from datetime import datetime
+import asyncio
+import base64
 import logging
+import orjson
 import sqlalchemy as sa
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
-from datetime import datetime, timezone
-from src.db.models import Chats
+from src.batching import AsyncBatcher
+from src.db.main import SessionLocal
+from src.db.models import Chats, uuid7
 import uuid
 from src.logger import setup_logger
 
@@ -13,19 +18,197 @@ from src.logger import setup_logger
 logger = setup_logger(__name__)
 
 
+def _as_uuid(value: Union[str, uuid.UUID]) -> uuid.UUID:
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+
+
+def build_chat_row(
+    user_id: str,
+    chat_id: Union[str, uuid.UUID],
+    user_input: str,
+    response: str,
+    message_uid: Optional[Union[str, uuid.UUID]] = None,
+    response_session_id: Optional[Union[str, uuid.UUID]] = None,
+    chat_metadata: Optional[Dict[str, Any]] = None,
+    record_id: Optional[Union[str, uuid.UUID]] = None
+) -> Dict[str, Any]:
+    """Map persist() arguments onto Chats column values; IDs may be str or UUID"""
+    return {
+        "id": _as_uuid(record_id) if record_id else uuid7(),
+        "user_id": user_id,
+        "chat_id": _as_uuid(chat_id) if chat_id else uuid7(),
+        "message_uid": _as_uuid(message_uid) if message_uid else None,
+        "response_session_id": _as_uuid(response_session_id) if response_session_id else None,
+        "user_input": user_input,
+        "response": response,
+        "chat_metadata": chat_metadata or {},
+        # created_at / updated_at are left to the column server defaults
+    }
+
+
+class ChatHistoryWriter(AsyncBatcher):
+    """Coalesces concurrent chat inserts into multi-row INSERTs.
+
+    Rows submitted through write() are buffered for up to BATCH_WINDOW seconds
+    (or until BATCH_MAX rows are pending) and flushed with a single INSERT and
+    COMMIT on a dedicated session, so N concurrent chats cost one commit
+    instead of N.
+    """
+
+    BATCH_MAX = 100
+    BATCH_WINDOW = 0.02  # seconds
+
+    async def write(self, row: Dict[str, Any]) -> None:
+        """Queue a row and wait until the batch containing it is committed"""
+        future = asyncio.get_running_loop().create_future()
+        self._put((row, future))
+        await future
+
+    async def _flush(self, batch: List[tuple]) -> None:
+        try:
+            await self._insert([row for row, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch, e)
+                return
+            # One bad row must not cost the rest of the batch: retry the rows one
+            # at a time so only the offending row's writer sees the exception
+            logger.warning("Failed to flush %d chat rows, retrying individually: %s", len(batch), e)
+            for item in batch:
+                try:
+                    await self._insert([item[0]])
+                except Exception as row_error:
+                    self._fail([item], row_error)
+                else:
+                    self._succeed([item])
+        else:
+            logger.debug("Flushed %d chat rows", len(batch))
+            self._succeed(batch)
+
+    @staticmethod
+    async def _insert(rows: List[Dict[str, Any]]) -> None:
+        async with SessionLocal() as session:
+            await session.execute(sa.insert(Chats), rows)
+            await session.commit()
+
+    @staticmethod
+    def _succeed(batch: List[tuple]) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    @staticmethod
+    def _fail(batch: List[tuple], error: Exception) -> None:
+        logger.error("Failed to insert %d chat rows: %s", len(batch), error)
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+
+history_writer = ChatHistoryWriter()
+
+
+# Columns returned by every history listing; response text and metadata are
+# the wide ones and are only read when the full view is requested
+_SUMMARY_COLUMNS = (
+    Chats.id,
+    Chats.user_id,
+    Chats.chat_id,
+    Chats.message_uid,
+    Chats.response_session_id,
+    Chats.user_input,
+    Chats.created_at,
+    Chats.updated_at,
+)
+# chat_metadata is read as its JSON text and embedded verbatim in the response,
+# so the JSONB blob is never decoded into a dict and re-encoded
+_DETAIL_COLUMNS = (
+    Chats.response,
+    sa.cast(Chats.chat_metadata, sa.Text).label("chat_metadata"),
+)
+
+
+def _listing_columns(full: bool) -> tuple:
+    return _SUMMARY_COLUMNS + _DETAIL_COLUMNS if full else _SUMMARY_COLUMNS
+
+
+def encode_cursor(created_at: datetime, record_id: uuid.UUID) -> str:
+    """Opaque page cursor: urlsafe base64 of the JSON pair [created_at, id]"""
+    return base64.urlsafe_b64encode(orjson.dumps([created_at, record_id])).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+    try:
+        created_at, record_id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(created_at), uuid.UUID(record_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _conversation_to_dict(row: tuple, full: bool) -> Dict[str, Any]:
+    """Convert a projected Chats row to the dictionary shape the frontend expects.
+
+    row is a plain tuple in _listing_columns order and is unpacked positionally.
+    IDs and timestamps are left as UUID/datetime and chat_metadata comes back
+    as an orjson.Fragment, so the result must be rendered with orjson
+    (ORJSONResponse), not jsonable_encoder.
+    """
+    (record_id, user_id, chat_id, message_uid, response_session_id,
+     user_input, created_at, updated_at) = row[:8]
+    # UUIDs and datetimes stay native; orjson renders them in the response
+    item = {
+        "id": record_id,
+        "user_id": user_id,
+        "chat_id": chat_id,
+        "message_uid": message_uid,
+        "response_session_id": response_session_id,
+        "user_input": user_input,
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+    if full:
+        response, chat_metadata = row[8:]
+        item["response"] = response  # Changed from bedrock_response
+        item["chat_metadata"] = (
+            orjson.Fragment(chat_metadata) if chat_metadata is not None else None
+        )
+    return item
+
+
+def _persisted_to_dict(row: Dict[str, Any], created_at: datetime) -> Dict[str, Any]:
+    """Summary of an inserted build_chat_row() dict; only created_at comes from the DB"""
+    message_uid = row["message_uid"]
+    response_session_id = row["response_session_id"]
+    return {
+        "id": str(row["id"]),
+        "chat_id": str(row["chat_id"]),
+        "user_id": row["user_id"],
+        "message_uid": str(message_uid) if message_uid else None,
+        "response_session_id": str(response_session_id) if response_session_id else None,
+        "created_at": created_at.isoformat()
+    }
+
+
 class ChatHistoryService:
-    """Service layer for chat-history related operations using asynchronous database operations."""
+    """Service layer for chat-history related operations using asynchronous database operations.
+
+    Every method runs on the session it is given. To run two of them
+    concurrently (asyncio.gather), give each its own session: one session is
+    one connection and cannot serve overlapping queries.
+    """
 
     async def persist(
         self,
         user_id: str,
-        chat_id: str,
+        chat_id: Union[str, uuid.UUID],
         user_input: str,
         response: str,
-        message_uid: Optional[str] = None,
-        response_session_id: Optional[str] = None,
+        message_uid: Optional[Union[str, uuid.UUID]] = None,
+        response_session_id: Optional[Union[str, uuid.UUID]] = None,
         chat_metadata: Optional[Dict[str, Any]] = None,
-        session: Optional[AsyncSession] = None
+        session: Optional[AsyncSession] = None,
+        record_id: Optional[Union[str, uuid.UUID]] = None
     ) -> Dict[str, Any]:
         """Persist a conversation to the database with retry logic"""
         max_retries = 3
@@ -33,33 +216,18 @@ class ChatHistoryService:
         
         while retry_count < max_retries:
             try:
-                new_chat = Chats(
-                    id=uuid.uuid4(),
+                row = build_chat_row(
                     user_id=user_id,
-                    chat_id=uuid.UUID(chat_id) if chat_id else uuid.uuid4(),
-                    message_uid=uuid.UUID(message_uid) if message_uid else None,
-                    response_session_id=uuid.UUID(response_session_id) if response_session_id else None,
+                    chat_id=chat_id,
                     user_input=user_input,
                     response=response,
-                    chat_metadata=chat_metadata or {},
-                    created_at=datetime.now(timezone.utc),
-                    updated_at=datetime.now(timezone.utc)
+                    message_uid=message_uid,
+                    response_session_id=response_session_id,
+                    chat_metadata=chat_metadata,
+                    record_id=record_id
                 )
-
-                if session:
-                    session.add(new_chat)
-                    await session.flush()
-                    await session.commit()
-                    await session.refresh(new_chat)
-                
-                return {
-                    "id": str(new_chat.id),
-                    "chat_id": str(new_chat.chat_id),
-                    "user_id": new_chat.user_id,
-                    "message_uid": str(new_chat.message_uid) if new_chat.message_uid else None,
-                    "response_session_id": str(new_chat.response_session_id) if new_chat.response_session_id else None,
-                    "created_at": new_chat.created_at.isoformat()
-                }
+                persisted = await self.persist_many(session, [row])
+                return persisted[0]
             
             except Exception as e:
                 retry_count += 1
@@ -75,7 +243,6 @@ class ChatHistoryService:
                 
                 if is_connection_error and retry_count < max_retries:
                     logger.warning(f"Database connection error (attempt {retry_count}/{max_retries}): {e}")
-                    import asyncio
                     await asyncio.sleep(0.5 * retry_count)  # Exponential backoff
                     continue
                 
@@ -84,40 +251,69 @@ class ChatHistoryService:
         
         
 
+    async def persist_many(
+        self,
+        session: AsyncSession,
+        rows: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """Insert several conversations in one statement and commit once.
+
+        rows are build_chat_row() dicts. The INSERT bypasses the ORM unit of
+        work, so psycopg sends it as a batched executemany; RETURNING supplies
+        only the server-filled created_at, since the IDs are already known
+        from rows. Results come back in the order of rows.
+        """
+        if not rows:
+            return []
+        statement = sa.insert(Chats).returning(Chats.created_at, sort_by_parameter_order=True)
+        result = await session.execute(statement, rows)
+        persisted = [
+            _persisted_to_dict(row, created_at)
+            for row, created_at in zip(rows, result.scalars())
+        ]
+        await session.commit()
+        return persisted
+
+    async def persist_in_background(self, **kwargs: Any) -> None:
+        """Persist a conversation after the response has been sent.
+
+        The row goes through the shared ChatHistoryWriter, which batches it with
+        other concurrent inserts. Failures are logged, not raised.
+        """
+        try:
+            row = build_chat_row(**kwargs)
+            await history_writer.write(row)
+            logger.info(f"✅ Conversation persisted with ID: {row['id']}")
+        except Exception as e:
+            logger.exception(f"Failed to persist conversation in background: {e}")
+
     async def fetch(
         self,
         session: AsyncSession,
         user_id: str,
         limit: int = 50,
         offset: int = 0,
+        full: bool = True,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
     ) -> List[Dict[str, Any]]:
-        """Fetch conversation history for a user, ordered by most recent first."""
+        """Fetch conversation history for a user, ordered by most recent first.
+
+        With after=(created_at, id) of the last row already seen, the page starts
+        right past it (keyset pagination) and offset is ignored.
+        With full=False the response text and metadata are not read from the database.
+        """
         statement = (
-            select(Chats)
+            select(*_listing_columns(full))
             .where(Chats.user_id == user_id)
-            .order_by(Chats.created_at.desc())
-            .offset(offset)
+            .order_by(Chats.created_at.desc(), Chats.id.desc())
             .limit(limit)
         )
-        results = await session.exec(statement)
-        conversations = results.all()
-        
-        # Convert SQLModel objects to dictionaries matching frontend expectations
-        return [
-            {
-                "id": str(conv.id),
-                "user_id": conv.user_id,
-                "chat_id": str(conv.chat_id),
-                "message_uid": str(conv.message_uid) if conv.message_uid else None,
-                "response_session_id": str(conv.response_session_id) if conv.response_session_id else None,
-                "user_input": conv.user_input,
-                "response": conv.response,  # Changed from bedrock_response
-                "chat_metadata": conv.chat_metadata,
-                "created_at": conv.created_at.isoformat() if conv.created_at else None,
-                "updated_at": conv.updated_at.isoformat() if conv.updated_at else None,
-            }
-            for conv in conversations
-        ]
+        if after is not None:
+            statement = statement.where(sa.tuple_(Chats.created_at, Chats.id) < sa.tuple_(*after))
+        elif offset:
+            statement = statement.offset(offset)
+        results = await session.execute(statement)
+        return [_conversation_to_dict(row, full) for row in results.tuples()]
 
     async def fetch_by_chat(
         self,
@@ -125,52 +321,45 @@ class ChatHistoryService:
         chat_id: uuid.UUID,
         limit: int = 50,
         offset: int = 0,
+        full: bool = True,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
     ) -> List[Dict[str, Any]]:
-        """Fetch all messages in a specific chat conversation."""
+        """Fetch all messages in a specific chat conversation, oldest first.
+
+        after works as in fetch(), in ascending order.
+        """
         statement = (
-            select(Chats)
+            select(*_listing_columns(full))
             .where(Chats.chat_id == chat_id)
-            .order_by(Chats.created_at.asc())
-            .offset(offset)
+            .order_by(Chats.created_at.asc(), Chats.id.asc())
             .limit(limit)
         )
-        results = await session.exec(statement)
-        conversations = results.all()
-        
-        # Convert SQLModel objects to dictionaries matching frontend expectations
-        return [
-            {
-                "id": str(conv.id),
-                "user_id": conv.user_id,
-                "chat_id": str(conv.chat_id),
-                "message_uid": str(conv.message_uid) if conv.message_uid else None,
-                "response_session_id": str(conv.response_session_id) if conv.response_session_id else None,
-                "user_input": conv.user_input,
-                "response": conv.response,  # Changed from bedrock_response
-                "chat_metadata": conv.chat_metadata,
-                "created_at": conv.created_at.isoformat() if conv.created_at else None,
-                "updated_at": conv.updated_at.isoformat() if conv.updated_at else None,
-            }
-            for conv in conversations
-        ]
+        if after is not None:
+            statement = statement.where(sa.tuple_(Chats.created_at, Chats.id) > sa.tuple_(*after))
+        elif offset:
+            statement = statement.offset(offset)
+        results = await session.execute(statement)
+        return [_conversation_to_dict(row, full) for row in results.tuples()]
 
     async def get_conversation_count(
         self,
         session: AsyncSession,
         user_id: str,
         chat_id: Optional[uuid.UUID] = None,
+        cap: int = 10000,
     ) -> int:
-        """Get total count of conversations for pagination."""
+        """Get the count of conversations for pagination, stopping at cap.
+
+        The count runs over a LIMIT cap subquery, so latency stays bounded for
+        very large histories; a result equal to cap means "at least cap".
+        """
         try:
             if chat_id:
-                statement = select(sa.func.count()).select_from(Chats).where(
-                    Chats.chat_id == chat_id
-                )
+                matching = sa.select(sa.literal(1)).where(Chats.chat_id == chat_id)
             else:
-                statement = select(sa.func.count()).select_from(Chats).where(
-                    Chats.user_id == user_id
-                )
-            
+                matching = sa.select(sa.literal(1)).where(Chats.user_id == user_id)
+            statement = select(sa.func.count()).select_from(matching.limit(cap).subquery())
+
             result = await session.execute(statement)
             count = result.scalar()
             return count or 0
@@ -184,38 +373,57 @@ class ChatHistoryService:
         chat_id: uuid.UUID,
         user_id: str = "anonymous"
     ) -> bool:
-        """Delete all conversations in a chat session"""
+        """Delete all conversations in a chat session with one DELETE ... RETURNING"""
         try:
-            statement = select(Chats).where(Chats.chat_id == chat_id)
-            result = await session.exec(statement)
-            conversations = result.all()
-            
-            if not conversations:
+            statement = sa.delete(Chats).where(Chats.chat_id == chat_id).returning(Chats.id)
+            result = await session.execute(statement)
+            deleted = len(result.scalars().all())
+
+            if not deleted:
                 logger.warning(f"Chat session {chat_id} not found")
                 return False
-            
-            for conv in conversations:
-                await session.delete(conv)
-            
+
             await session.commit()
-            logger.info(f"Deleted {len(conversations)} conversations from chat session {chat_id}")
+            logger.info(f"Deleted {deleted} conversations from chat session {chat_id}")
             return True
         except Exception as e:
             await session.rollback()
             logger.exception(f"Failed to delete chat session: {e}")
             return False
-            statement = select(Chats).where(
-                Chats.chat_id == chat_id,
-                Chats.user_id == user_id
+
+    async def rename_chat(
+        self,
+        session: AsyncSession,
+        chat_id: uuid.UUID,
+        user_id: str,
+        new_title: str
+    ) -> Optional[str]:
+        """Set the title in chat_metadata of every message in a chat.
+
+        One UPDATE merges {"title": new_title} into the JSONB server-side.
+        Returns the new title, or None if the chat has no messages for user_id.
+        """
+        try:
+            merged = sa.func.coalesce(Chats.chat_metadata, sa.func.jsonb_build_object()).op("||")(
+                sa.func.jsonb_build_object("title", new_title)
             )
-            result = await session.exec(statement)
-            conversations = result.all()
-            
+            statement = (
+                sa.update(Chats)
+                .where(Chats.chat_id == chat_id, Chats.user_id == user_id)
+                .values(chat_metadata=merged)
+                .execution_options(synchronize_session=False)
+            )
+            result = await session.execute(statement)
+
+            if not result.rowcount:
+                logger.warning(f"Chat {chat_id} not found for rename")
+                return None
+
             await session.commit()
             logger.info(f"Renamed conversations in chat {chat_id} to '{new_title}'")
             return new_title
-            
+
         except Exception as e:
             await session.rollback()
             logger.exception(f"Failed to rename chat: {e}")
-            return 0
+            return None
@@ -1,11 +1,19 @@
 
+import atexit
+import functools
 import logging
+import queue
 import sys
 import os
 import io
 from datetime import datetime
 from pathlib import Path
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+    TimedRotatingFileHandler,
+)
 from typing import Optional
 
 # Configure UTF-8 encoding for stdout/stderr on Windows BEFORE any logging setup
@@ -39,60 +47,117 @@ class ColoredFormatter(logging.Formatter):
         'CRITICAL': '\033[35m', # Magenta
     }
     RESET = '\033[0m'
-    
+
+    def __init__(self, fmt=None, datefmt=None, style='%', **kwargs):
+        super().__init__(fmt, datefmt, style, **kwargs)
+        # The color goes into the format string (one formatter per level), not
+        # into record.levelname: the record is shared with the file handlers,
+        # which must not see the escape codes
+        fmt = self._style._fmt
+        self._level_formatters = {
+            levelname: logging.Formatter(
+                fmt.replace('%(levelname)s', f'{color}%(levelname)s{self.RESET}'),
+                datefmt, style, **kwargs
+            )
+            for levelname, color in self.COLORS.items()
+        }
+
     def format(self, record):
-        if record.levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[record.levelname]}{record.levelname}{self.RESET}"
-        return super().format(record)
+        formatter = self._level_formatters.get(record.levelname)
+        if formatter is None:
+            return super().format(record)
+        return formatter.format(record)
+
+
+# File handlers are shared by every logger and fed through a queue: log calls
+# on the request path only enqueue the record, and a background listener
+# thread does the formatting, disk writes and rotation.
+_file_formatter = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# File handler for all logs (with UTF-8 encoding)
+_file_handler = RotatingFileHandler(
+    LOG_FILE,
+    maxBytes=10*1024*1024,  # 10MB
+    backupCount=5,
+    encoding='utf-8'
+)
+_file_handler.setLevel(logging.DEBUG)
+_file_handler.setFormatter(_file_formatter)
+
+# Error file handler for errors only (with UTF-8 encoding)
+_error_handler = logging.FileHandler(ERROR_LOG_FILE, encoding='utf-8')
+_error_handler.setLevel(logging.ERROR)
+_error_handler.setFormatter(_file_formatter)
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_queue_handler = QueueHandler(_log_queue)
+_queue_listener: Optional[QueueListener] = None
+
+
+def _start_queue_listener() -> None:
+    global _queue_listener
+    _queue_listener = QueueListener(
+        _log_queue, _file_handler, _error_handler, respect_handler_level=True
+    )
+    _queue_listener.start()
+
+
+def _stop_queue_listener() -> None:
+    """Flush queued records to disk (registered with atexit)"""
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+
+def _restart_queue_listener_in_child() -> None:
+    """Forked children (e.g. Celery prefork workers) don't inherit the listener
+    thread; records still queued at fork time belong to the parent, so the
+    child starts over with an empty queue of its own.
+    """
+    global _log_queue
+    _log_queue = queue.SimpleQueue()
+    _queue_handler.queue = _log_queue
+    _start_queue_listener()
+
+
+_start_queue_listener()
+atexit.register(_stop_queue_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_queue_listener_in_child)
 
 
+# Console handler with colors (sys.stdout already configured for UTF-8 on Windows)
+_console_handler = logging.StreamHandler(sys.stdout)
+_console_handler.setFormatter(ColoredFormatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+))
+
+
+def _install_root_handlers() -> None:
+    """Attach the console and file handlers to the root logger, once"""
+    root = logging.getLogger()
+    if _queue_handler not in root.handlers:
+        root.addHandler(_console_handler)
+        # app.log / error.log, written by the queue listener thread
+        root.addHandler(_queue_handler)
+
+
+@functools.lru_cache(maxsize=None)
 def setup_logger(name: str, level: str = "INFO") -> logging.Logger:
-  
+    """Return the named logger at the given level.
+
+    Handlers live on the root logger only (attached on first use) and records
+    reach them by propagation, so every module shares one console stream and
+    one set of log files instead of attaching its own.
+    """
+    _install_root_handlers()
+
     logger = logging.getLogger(name)
-    
-    # Avoid duplicate handlers
-    if logger.handlers:
-        return logger
-        
-    # Set logging level
-    log_level = getattr(logging, level.upper(), logging.INFO)
-    logger.setLevel(log_level)
-        
-    
-    colored_formatter = ColoredFormatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Console handler with colors (sys.stdout already configured for UTF-8 on Windows)
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(log_level)
-    console_handler.setFormatter(colored_formatter)
-    logger.addHandler(console_handler)
-    
-    # Create formatters
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # File handler for all logs (with UTF-8 encoding)
-    file_handler = RotatingFileHandler(
-        LOG_FILE,
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5,
-        encoding='utf-8'
-    )
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-    
-    # Error file handler for errors only (with UTF-8 encoding)
-    error_handler = logging.FileHandler(ERROR_LOG_FILE, encoding='utf-8')
-    error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(formatter)
-    logger.addHandler(error_handler)
-    
+    logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+
     return logger
 
 
@@ -110,6 +175,8 @@ def log_request(request, response_status: int, processing_time: float):
         access_handler.setFormatter(access_formatter)
         access_logger.addHandler(access_handler)
         access_logger.setLevel(logging.INFO)
+        # access.log only; keep these out of the root console/app.log handlers
+        access_logger.propagate = False
     
     # Log request details
     access_logger.info(
@@ -1,32 +1,63 @@
+import asyncio
 import functools
-from logger import logging
+import logging
 import time
 import contextvars
+from src.logger import setup_logger
+
+logger = setup_logger(__name__)
 
 tools_called = contextvars.ContextVar("tools_called", default=None)
 
+
+def _record_tool(tool_name):
+    """Append tool_name to this context's list, creating the list on first use"""
+    tool_list = tools_called.get()
+    if tool_list is None:
+        tool_list = []
+        tools_called.set(tool_list)
+    tool_list.append(tool_name)
+
+
+def _log_start(tool_name, args, kwargs):
+    # Argument reprs can be large, so they are only built when DEBUG is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[TOOL CALL] Tool '%s' called with args=%r, kwargs=%r", tool_name, args, kwargs)
+    else:
+        logger.info("[TOOL CALL] Tool '%s' called", tool_name)
+
+
 def log_tool_call(tool_name):
     def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            # Coroutine functions need an async wrapper, otherwise the timing and
+            # error logging would only cover creating the coroutine, not running it
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                _record_tool(tool_name)
+                start = time.perf_counter()
+                _log_start(tool_name, args, kwargs)
+                try:
+                    result = await func(*args, **kwargs)
+                    logger.info("[TOOL CALL] Tool '%s' completed in %.2fs", tool_name, time.perf_counter() - start)
+                    return result
+                except Exception as e:
+                    logger.error("[TOOL CALL] Tool '%s' failed: %s", tool_name, e)
+                    raise
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Initialize the list if not already set
-            tool_list = tools_called.get()
-            if tool_list is None:
-                tool_list = []
-                tools_called.set(tool_list)
-            tool_list.append(tool_name)
-            start = time.time()
-            logging.info(
-                f"[TOOL CALL] Tool '{tool_name}' called with args={args}, kwargs={kwargs}"
-            )
+            _record_tool(tool_name)
+            start = time.perf_counter()
+            _log_start(tool_name, args, kwargs)
             try:
                 result = func(*args, **kwargs)
-                logging.info(
-                    f"[TOOL CALL] Tool '{tool_name}' completed in {time.time()-start:.2f}s"
-                )
+                logger.info("[TOOL CALL] Tool '%s' completed in %.2fs", tool_name, time.perf_counter() - start)
                 return result
             except Exception as e:
-                logging.error(f"[TOOL CALL] Tool '{tool_name}' failed: {e}")
+                logger.error("[TOOL CALL] Tool '%s' failed: %s", tool_name, e)
                 raise
 
         return wrapper
@@ -1,14 +1,39 @@
 from fastapi import FastAPI, status
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import time
+import uuid
 import logging
 from src.config import Config as settings
 
 logger = logging.getLogger(__name__)
 
+# Load-balancer health probes: polled constantly, so they skip request logging
+UNLOGGED_PATHS = frozenset({"/health", "/api/v1/health"})
+
+# Liveness probe body, serialized once
+HEALTH_OK_BODY = b'{"status":"ok"}'
+
+
+class HealthCheckMiddleware:
+    """Answer GET /health before any other middleware or routing runs.
+
+    Registered outermost, so liveness probes skip CORS, request logging and
+    FastAPI dispatch and get a constant response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.response = Response(content=HEALTH_OK_BODY, media_type="application/json")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/health" and scope["method"] == "GET":
+            await self.response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
 
 def register_middleware(app: FastAPI):
     """Register all middleware for the FastAPI application"""
@@ -16,27 +41,33 @@ def register_middleware(app: FastAPI):
     @app.middleware("http")
     async def add_request_id_and_logging(request: Request, call_next):
         """Add unique request ID and log all incoming requests with timing"""
-        import uuid
-        
+        if request.url.path in UNLOGGED_PATHS:
+            return await call_next(request)
+
         # Generate unique request ID for tracking
         request_id = str(uuid.uuid4())
         request.state.request_id = request_id
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         response = await call_next(request)
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
         
         # Add request ID to response headers for debugging
         response.headers["X-Request-ID"] = request_id
         
-        message = f"[{request_id}] {request.client.host}:{request.client.port} - {request.method} - {request.url.path} - {response.status_code} completed after {processing_time:.3f}s"
-        logger.info(message)
+        if logger.isEnabledFor(logging.INFO):
+            client = request.client
+            logger.info(
+                "[%s] %s:%s - %s - %s - %d completed after %.3fs",
+                request_id, client.host if client else "-", client.port if client else "-",
+                request.method, request.url.path, response.status_code, processing_time
+            )
         
         return response
     
     # CORS Middleware
-    # ALLOWED_ORIGINS is already parsed to list by field_validator
+    # ALLOWED_ORIGINS is parsed to a list by Settings
     allowed_origins = settings.ALLOWED_ORIGINS
     logger.info(f"CORS allowed origins: {allowed_origins}")
     
@@ -54,10 +85,18 @@ def register_middleware(app: FastAPI):
     # We rely on ALB security groups and CORS for access control
     allowed_hosts = ["*"]
     
-    app.add_middleware(
-        TrustedHostMiddleware,
-        allowed_hosts=allowed_hosts
-    )
-    logger.info(f"✅ Trusted host middleware configured: {allowed_hosts}")
+    if "*" in allowed_hosts:
+        # A wildcard accepts every host, so the middleware would only add a
+        # Host-header parse to each request; leave it out of the stack
+        logger.info("Trusted host middleware skipped: all hosts allowed")
+    else:
+        app.add_middleware(
+            TrustedHostMiddleware,
+            allowed_hosts=allowed_hosts
+        )
+        logger.info(f"✅ Trusted host middleware configured: {allowed_hosts}")
     
+    # Added last so it is the outermost layer
+    app.add_middleware(HealthCheckMiddleware)
+
     logger.info("✅ Middleware registered successfully")
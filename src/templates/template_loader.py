@@ -2,12 +2,25 @@
 Template loader utility for loading and rendering HTML email templates.
 This keeps the existing mail.py functionality intact while making templates modular.
 """
+import re
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any
 
+# The templates directory (same folder as this file)
+TEMPLATES_DIR = Path(__file__).parent
+
+# {name} placeholders; CSS blocks like "{ font-family: ... }" do not match
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+@lru_cache(maxsize=64)
 def load_template(template_name: str) -> str:
     """
     Load an HTML template from the templates folder.
+
+    Cached per name: templates ship with the code, so each file is read
+    once per process instead of on every email.
     
     Args:
         template_name: Name of the template file (with or without .html extension)
@@ -15,8 +28,7 @@ def load_template(template_name: str) -> str:
     Returns:
         Raw HTML content as string
     """
-    # Get the templates directory (same folder as this file)
-    templates_dir = Path(__file__).parent
+    templates_dir = TEMPLATES_DIR
     
     # Add .html extension if not present
     if not template_name.endswith('.html'):
@@ -31,6 +43,12 @@ def load_template(template_name: str) -> str:
         return f.read()
 
 
+@lru_cache(maxsize=64)
+def _compile_template(template_name: str) -> tuple[str, ...]:
+    """Split a template into alternating literal text and placeholder names"""
+    return tuple(_PLACEHOLDER.split(load_template(template_name)))
+
+
 def render_template(template_name: str, **context: Any) -> str:
     """
     Load a template and substitute variables with provided context.
@@ -42,11 +60,13 @@ def render_template(template_name: str, **context: Any) -> str:
     Returns:
         Rendered HTML with variables substituted
     """
-    html_content = load_template(template_name)
+    parts = _compile_template(template_name)
     
-    # Simple variable substitution using format()
+    # Odd positions are placeholder names, even positions literal HTML
     try:
-        return html_content.format(**context)
+        return "".join(
+            str(context[part]) if i % 2 else part for i, part in enumerate(parts)
+        )
     except KeyError as e:
         raise ValueError(f"Missing template variable: {e}")
 
@@ -58,5 +78,4 @@ def get_available_templates() -> list[str]:
     Returns:
         List of template filenames
     """
-    templates_dir = Path(__file__).parent
-    return [f.name for f in templates_dir.glob('*.html')]
\ No newline at end of file
+    return [f.name for f in TEMPLATES_DIR.glob('*.html')]
\ No newline at end of file
@@ -15,12 +15,12 @@ echo "=========================================="
 case "$SERVICE_TYPE" in
   api)
     echo "Starting FastAPI server with Uvicorn..."
-    exec uvicorn main:app --host 0.0.0.0 --port 8000 --workers 4
+    exec uvicorn main:create_app --factory --host 0.0.0.0 --port 8000 --workers 4
     ;;
   
   celery)
     echo "Starting Celery worker..."
-    exec celery -A src.celery_tasks.c_app worker --loglevel=info --concurrency=2
+    exec celery -A src.celery_tasks.c_app worker -Q emails,celery -Ofair --loglevel=info --concurrency=2
     ;;
   
   celery-beat)